@@ -1,9 +1,52 @@
+-- weights_config rules, the same as talent_match/weights.parse_weights: an
+-- object (or NULL) whose 'tgv' / 'tv' are objects (or absent), TGV keys from
+-- the five of tgv_weights below, every weight a JSON number >= 0, and at least
+-- one TGV weight > 0 once the defaults are filled in
+CREATE OR REPLACE FUNCTION fn_weights_config_valid(cfg JSONB)
+RETURNS BOOLEAN
+LANGUAGE sql IMMUTABLE AS $$
+  SELECT CASE
+    WHEN cfg IS NULL OR jsonb_typeof(cfg) = 'null' THEN true
+    WHEN jsonb_typeof(cfg) <> 'object'
+      OR COALESCE(jsonb_typeof(cfg->'tgv'), 'null') NOT IN ('null', 'object')
+      OR COALESCE(jsonb_typeof(cfg->'tv'), 'null') NOT IN ('null', 'object') THEN false
+    ELSE NOT EXISTS (
+           SELECT 1
+           FROM jsonb_object_keys(COALESCE(NULLIF(cfg->'tgv', 'null'), '{}')) AS k(name)
+           WHERE k.name NOT IN ('Competencies', 'Cognitive', 'PersonalityPAPI', 'Context', 'BehaviorStrengths'))
+     AND NOT EXISTS (
+           SELECT 1
+           FROM (SELECT value FROM jsonb_each(COALESCE(NULLIF(cfg->'tgv', 'null'), '{}'))
+                 UNION ALL
+                 SELECT value FROM jsonb_each(COALESCE(NULLIF(cfg->'tv', 'null'), '{}'))) AS w(weight)
+           WHERE CASE WHEN jsonb_typeof(w.weight) = 'number' THEN w.weight::numeric < 0 ELSE true END)
+     AND (SELECT SUM(COALESCE(CASE WHEN jsonb_typeof(cfg->'tgv'->d.name) = 'number'
+                                   THEN (cfg->'tgv'->>d.name)::numeric END, d.weight))
+          FROM (VALUES ('Competencies', 0.40), ('Cognitive', 0.30), ('PersonalityPAPI', 0.15),
+                       ('Context', 0.10), ('BehaviorStrengths', 0.05)) AS d(name, weight)) > 0
+  END
+$$;
+
+-- enforce them on write; NOT VALID so rows saved before the check do not
+-- block the migration (the view below skips them)
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'talent_benchmarks_weights_config_check') THEN
+    ALTER TABLE talent_benchmarks ADD CONSTRAINT talent_benchmarks_weights_config_check
+      CHECK (fn_weights_config_valid(weights_config)) NOT VALID;
+  END IF;
+END;
+$$;
+
 -- View: v_benchmark_matching  (benchmark-aware + job_vacancy_id carried through)
 CREATE OR REPLACE VIEW v_benchmark_matching AS
 WITH params AS (
   -- ambil SEMUA benchmark; app akan memfilter berdasarkan job_vacancy_id
-  SELECT tb.job_vacancy_id, tb.role_name, tb.job_level, tb.role_purpose, tb.selected_talent_ids
+  SELECT tb.job_vacancy_id, tb.role_name, tb.job_level, tb.role_purpose, tb.selected_talent_ids,
+         COALESCE(tb.weights_config, '{}'::jsonb) AS weights_config
   FROM talent_benchmarks tb
+  -- a malformed weights_config drops only that benchmark (parse_weights raises for it)
+  WHERE fn_weights_config_valid(tb.weights_config)
 ),
 latest AS (
   SELECT employee_id, MAX(year) AS latest_year
@@ -93,26 +136,52 @@ tv_match AS (
    AND b.tv_name  = t.tv_name
 ),
 tgv_match AS (
-  -- avg TV match in each TGV per employee × job_vacancy_id
-  SELECT employee_id,
-         job_vacancy_id,
-         tgv_name,
-         AVG(tv_match_rate)::numeric AS tgv_match_rate
-  FROM tv_match
+  -- weighted avg TV match in each TGV per employee × job_vacancy_id
+  -- (weights_config->'tv', default weight 1 = plain average)
+  SELECT tm.employee_id,
+         tm.job_vacancy_id,
+         tm.tgv_name,
+         (SUM(tm.tv_match_rate * tm.tv_weight)
+          / NULLIF(SUM(CASE WHEN tm.tv_match_rate IS NOT NULL THEN tm.tv_weight END), 0)
+         )::numeric AS tgv_match_rate
+  FROM (
+    -- only JSON numbers are cast, so no weights_config can make the cast fail
+    SELECT m.*,
+           COALESCE(CASE WHEN jsonb_typeof(p.weights_config->'tv'->m.tv_name) = 'number'
+                         THEN (p.weights_config->'tv'->>m.tv_name)::numeric END, 1) AS tv_weight
+    FROM tv_match m
+    LEFT JOIN params p ON p.job_vacancy_id = m.job_vacancy_id
+  ) tm
   GROUP BY 1,2,3
 ),
+tgv_weights AS (
+  -- weights_config->'tgv' over the default 0.40/0.30/0.15/0.10/0.05, normalized to sum 1
+  SELECT w.job_vacancy_id,
+         w.tgv_name,
+         w.weight / NULLIF(SUM(w.weight) OVER (PARTITION BY w.job_vacancy_id), 0) AS weight
+  FROM (
+    SELECT p.job_vacancy_id,
+           d.tgv_name,
+           COALESCE(CASE WHEN jsonb_typeof(p.weights_config->'tgv'->d.tgv_name) = 'number'
+                         THEN (p.weights_config->'tgv'->>d.tgv_name)::numeric END, d.weight) AS weight
+    FROM params p
+    CROSS JOIN (VALUES
+      ('Competencies',      0.40),
+      ('Cognitive',         0.30),
+      ('PersonalityPAPI',   0.15),
+      ('Context',           0.10),
+      ('BehaviorStrengths', 0.05)
+    ) AS d(tgv_name, weight)
+  ) w
+),
 final_match AS (
   -- formula TGV → final match per employee × job_vacancy_id
-  SELECT employee_id,
-         job_vacancy_id,
-         ROUND(
-           0.40*COALESCE(MAX(CASE WHEN tgv_name='Competencies'      THEN tgv_match_rate END),0) +
-           0.30*COALESCE(MAX(CASE WHEN tgv_name='Cognitive'         THEN tgv_match_rate END),0) +
-           0.15*COALESCE(MAX(CASE WHEN tgv_name='PersonalityPAPI'   THEN tgv_match_rate END),0) +
-           0.10*COALESCE(MAX(CASE WHEN tgv_name='Context'           THEN tgv_match_rate END),0) +
-           0.05*COALESCE(MAX(CASE WHEN tgv_name='BehaviorStrengths' THEN tgv_match_rate END),0)
-         ,2)::numeric AS final_match_rate
-  FROM tgv_match
+  SELECT tg.employee_id,
+         tg.job_vacancy_id,
+         ROUND(SUM(w.weight * COALESCE(tg.tgv_match_rate, 0)), 2)::numeric AS final_match_rate
+  FROM tgv_match tg
+  JOIN tgv_weights w ON w.job_vacancy_id = tg.job_vacancy_id
+                    AND w.tgv_name       = tg.tgv_name
   GROUP BY 1,2
 )
 SELECT
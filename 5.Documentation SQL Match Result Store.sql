@@ -0,0 +1,155 @@
+-- Documentation SQL Match Result Store
+-- Persisted employee x TV match rows per job_vacancy_id, so re-running a saved
+-- benchmark is one indexed lookup instead of a full v_benchmark_matching scan.
+-- Filled by the app (talent_match/store.py) when a benchmark is saved or
+-- re-run; only benchmarks touched by a source-data change are recomputed.
+
+-- 1) Result rows (same columns as v_benchmark_matching, minus employee metadata
+--    which is joined at read time so renames never make results stale)
+CREATE TABLE IF NOT EXISTS benchmark_match_results (
+  job_vacancy_id   INT     NOT NULL REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE,
+  employee_id      TEXT    NOT NULL,
+  tgv_name         TEXT    NOT NULL,
+  tv_name          TEXT    NOT NULL,
+  baseline_score   NUMERIC,
+  user_score       NUMERIC,
+  tv_match_rate    NUMERIC,
+  tgv_match_rate   NUMERIC,
+  final_match_rate NUMERIC,
+  PRIMARY KEY (job_vacancy_id, employee_id, tgv_name, tv_name)
+);
+
+-- ranked read path: WHERE job_vacancy_id = ? ORDER BY final_match_rate DESC, employee_id
+CREATE INDEX IF NOT EXISTS ix_bmr_rank
+  ON benchmark_match_results (job_vacancy_id, final_match_rate DESC, employee_id);
+
+-- 2) One row per materialized benchmark: the version marker shown in the app
+CREATE TABLE IF NOT EXISTS benchmark_match_state (
+  job_vacancy_id      INT PRIMARY KEY REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE,
+  source_version      BIGINT      NOT NULL,   -- talent_source_version.version covered
+  selected_talent_ids TEXT[]      NOT NULL,   -- benchmark employees the rows were built from
+  weights_config      JSONB       NOT NULL DEFAULT '{}',  -- weights the rows were scored with
+  row_count           INT         NOT NULL,
+  refreshed_at        TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- stores created before weights_config was honoured
+ALTER TABLE benchmark_match_state
+  ADD COLUMN IF NOT EXISTS weights_config JSONB NOT NULL DEFAULT '{}';
+
+-- 3) Change log of the scoring source tables (one row per employee touched)
+CREATE TABLE IF NOT EXISTS talent_source_changes (
+  change_id    BIGSERIAL PRIMARY KEY,
+  source_table TEXT        NOT NULL,
+  employee_id  TEXT        NOT NULL,
+  changed_at   TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+CREATE INDEX IF NOT EXISTS ix_tsc_employee ON talent_source_changes (employee_id, change_id);
+
+-- Data version. change_id is not commit-ordered (a transaction can take a
+-- lower id and commit after a refresh has read a higher MAX), so each logging
+-- statement bumps this single-row counter instead. The row lock is held until
+-- commit: the next writer waits and gets a higher version, so every version a
+-- reader can see is complete.
+CREATE TABLE IF NOT EXISTS talent_source_version (
+  id      BOOLEAN PRIMARY KEY DEFAULT true CHECK (id),
+  version BIGINT  NOT NULL
+);
+INSERT INTO talent_source_version (version)
+SELECT COALESCE(MAX(change_id), 0) FROM talent_source_changes
+ON CONFLICT (id) DO NOTHING;
+
+-- logs created before the counter: their change_id was the version
+ALTER TABLE talent_source_changes ADD COLUMN IF NOT EXISTS version BIGINT;
+UPDATE talent_source_changes SET version = change_id WHERE version IS NULL;
+ALTER TABLE talent_source_changes ALTER COLUMN version SET NOT NULL;
+CREATE INDEX IF NOT EXISTS ix_tsc_version ON talent_source_changes (version);
+
+CREATE OR REPLACE FUNCTION fn_log_talent_source_change()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  touched TEXT[] := '{}';
+  v       BIGINT;
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    touched := touched || ARRAY(SELECT DISTINCT employee_id FROM new_rows WHERE employee_id IS NOT NULL);
+  END IF;
+  IF TG_OP IN ('UPDATE', 'DELETE') THEN
+    touched := touched || ARRAY(SELECT DISTINCT employee_id FROM old_rows WHERE employee_id IS NOT NULL);
+  END IF;
+  IF cardinality(touched) = 0 THEN
+    RETURN NULL;
+  END IF;
+
+  UPDATE talent_source_version SET version = version + 1 RETURNING version INTO v;
+  INSERT INTO talent_source_changes (source_table, employee_id, version)
+  SELECT DISTINCT TG_TABLE_NAME, e, v FROM unnest(touched) AS e;
+  RETURN NULL;
+END;
+$$;
+
+-- TRUNCATE fires no row triggers and has no transition table: log every
+-- employee of the table before it is emptied, so a reload (prep.py --replace)
+-- also recomputes, i.e. removes, the rows of employees it drops
+CREATE OR REPLACE FUNCTION fn_log_talent_source_truncate()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  v BIGINT;
+BEGIN
+  UPDATE talent_source_version SET version = version + 1 RETURNING version INTO v;
+  EXECUTE format('INSERT INTO talent_source_changes (source_table, employee_id, version)
+                  SELECT DISTINCT %L, employee_id, $1 FROM %I.%I WHERE employee_id IS NOT NULL',
+                 TG_TABLE_NAME, TG_TABLE_SCHEMA, TG_TABLE_NAME)
+  USING v;
+  RETURN NULL;
+END;
+$$;
+
+-- statement-level triggers with transition tables: one log row per employee
+-- per statement, so bulk loads stay cheap
+DO $$
+DECLARE
+  t TEXT;
+BEGIN
+  FOREACH t IN ARRAY ARRAY['competencies_yearly', 'papi_scores', 'profiles_psych',
+                           'performance_yearly', 'strengths']
+  LOOP
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_ins ON %1$I', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_upd ON %1$I', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_del ON %1$I', t);
+    EXECUTE format('DROP TRIGGER IF EXISTS trg_%1$s_trunc ON %1$I', t);
+    EXECUTE format('CREATE TRIGGER trg_%1$s_ins AFTER INSERT ON %1$I
+                    REFERENCING NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION fn_log_talent_source_change()', t);
+    EXECUTE format('CREATE TRIGGER trg_%1$s_upd AFTER UPDATE ON %1$I
+                    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION fn_log_talent_source_change()', t);
+    EXECUTE format('CREATE TRIGGER trg_%1$s_del AFTER DELETE ON %1$I
+                    REFERENCING OLD TABLE AS old_rows
+                    FOR EACH STATEMENT EXECUTE FUNCTION fn_log_talent_source_change()', t);
+    EXECUTE format('CREATE TRIGGER trg_%1$s_trunc BEFORE TRUNCATE ON %1$I
+                    FOR EACH STATEMENT EXECUTE FUNCTION fn_log_talent_source_truncate()', t);
+  END LOOP;
+END;
+$$;
+
+-- Staleness check used by the app (one row per benchmark)
+CREATE OR REPLACE VIEW v_benchmark_match_freshness AS
+SELECT s.job_vacancy_id,
+       s.source_version,
+       s.refreshed_at,
+       s.row_count,
+       v.version AS current_version,
+       s.selected_talent_ids IS DISTINCT FROM tb.selected_talent_ids
+         OR s.weights_config IS DISTINCT FROM COALESCE(tb.weights_config, '{}')
+         OR s.source_version < v.version
+         AS is_stale
+FROM benchmark_match_state s
+JOIN talent_benchmarks tb ON tb.job_vacancy_id = s.job_vacancy_id
+CROSS JOIN talent_source_version v;
+
+-- Old change-log rows can be pruned once every benchmark has caught up
+-- DELETE FROM talent_source_changes
+-- WHERE version <= (SELECT MIN(source_version) FROM benchmark_match_state);
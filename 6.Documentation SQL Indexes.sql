@@ -0,0 +1,115 @@
+-- Documentation SQL Indexes
+-- Covering indexes for the access paths of tv_all / v_benchmark_matching and a
+-- maintained latest-year lookup, so the matching queries stop re-aggregating
+-- performance_yearly on every run. Safe to re-run.
+-- Apply and verify (with EXPLAIN (ANALYZE, BUFFERS) before/after):
+--   python -m talent_match.indexes --dsn ... --apply --explain-out index_plans/
+
+-- 1) Source tables: every matching CTE joins on employee_id; INCLUDE the
+--    scored columns so the lookups can be index-only scans
+CREATE INDEX IF NOT EXISTS ix_competencies_yearly_emp_year
+  ON competencies_yearly (employee_id, year) INCLUDE (pillar_code, score);
+
+CREATE INDEX IF NOT EXISTS ix_performance_yearly_emp_year
+  ON performance_yearly (employee_id, year DESC) INCLUDE (rating);
+
+CREATE INDEX IF NOT EXISTS ix_papi_scores_emp
+  ON papi_scores (employee_id) INCLUDE (scale_code, score);
+
+CREATE INDEX IF NOT EXISTS ix_profiles_psych_emp
+  ON profiles_psych (employee_id) INCLUDE (iq, gtq, tiki);
+
+CREATE INDEX IF NOT EXISTS ix_strengths_emp
+  ON strengths (employee_id) INCLUDE (rank);
+
+-- 2) Employee metadata and dimension lookups joined for display
+CREATE INDEX IF NOT EXISTS ix_employees_emp
+  ON employees (employee_id) INCLUDE (fullname, directorate_id, position_id, grade_id);
+
+CREATE INDEX IF NOT EXISTS ix_dim_competency_pillars_code
+  ON dim_competency_pillars (pillar_code) INCLUDE (pillar_label);
+CREATE INDEX IF NOT EXISTS ix_dim_directorates_id ON dim_directorates (directorate_id) INCLUDE (name);
+CREATE INDEX IF NOT EXISTS ix_dim_positions_id    ON dim_positions (position_id)       INCLUDE (name);
+CREATE INDEX IF NOT EXISTS ix_dim_grades_id       ON dim_grades (grade_id)             INCLUDE (name);
+
+-- 3) Latest performance year per employee, kept current by triggers instead
+--    of SELECT employee_id, MAX(year) ... GROUP BY 1 in every query
+CREATE TABLE IF NOT EXISTS employee_latest_year (
+  employee_id TEXT   PRIMARY KEY,
+  latest_year BIGINT NOT NULL
+);
+
+CREATE OR REPLACE FUNCTION fn_refresh_employee_latest_year()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+DECLARE
+  touched TEXT[];
+  emp     TEXT;
+BEGIN
+  -- recompute only the employees touched by the statement
+  IF TG_OP = 'INSERT' THEN
+    touched := ARRAY(SELECT DISTINCT employee_id FROM new_rows);
+  ELSIF TG_OP = 'UPDATE' THEN
+    touched := ARRAY(SELECT employee_id FROM new_rows UNION SELECT employee_id FROM old_rows);
+  ELSE
+    touched := ARRAY(SELECT DISTINCT employee_id FROM old_rows);
+  END IF;
+
+  -- one writer per employee until commit, locked in a fixed order (no
+  -- deadlocks): a concurrent transaction touching the same employee waits here,
+  -- and the statements below (a new snapshot each, READ COMMITTED) then see
+  -- its committed years instead of overwriting them with an older MAX
+  FOREACH emp IN ARRAY ARRAY(SELECT DISTINCT e FROM unnest(touched) AS e WHERE e IS NOT NULL ORDER BY e) LOOP
+    PERFORM pg_advisory_xact_lock(8, hashtext(emp));
+  END LOOP;
+
+  -- upsert: never a unique violation that would abort the source statement
+  INSERT INTO employee_latest_year (employee_id, latest_year)
+  SELECT employee_id, MAX(year)
+  FROM performance_yearly
+  WHERE employee_id = ANY(touched) AND year IS NOT NULL
+  GROUP BY employee_id
+  ON CONFLICT (employee_id) DO UPDATE SET latest_year = EXCLUDED.latest_year;
+
+  -- employees left without a dated row
+  DELETE FROM employee_latest_year l
+  WHERE l.employee_id = ANY(touched)
+    AND NOT EXISTS (SELECT 1 FROM performance_yearly y
+                    WHERE y.employee_id = l.employee_id AND y.year IS NOT NULL);
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS trg_latest_year_ins ON performance_yearly;
+DROP TRIGGER IF EXISTS trg_latest_year_upd ON performance_yearly;
+DROP TRIGGER IF EXISTS trg_latest_year_del ON performance_yearly;
+CREATE TRIGGER trg_latest_year_ins AFTER INSERT ON performance_yearly
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_refresh_employee_latest_year();
+CREATE TRIGGER trg_latest_year_upd AFTER UPDATE ON performance_yearly
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_refresh_employee_latest_year();
+CREATE TRIGGER trg_latest_year_del AFTER DELETE ON performance_yearly
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION fn_refresh_employee_latest_year();
+
+-- backfill (also repairs drift, e.g. after a TRUNCATE of performance_yearly)
+INSERT INTO employee_latest_year (employee_id, latest_year)
+SELECT employee_id, MAX(year)
+FROM performance_yearly
+WHERE employee_id IS NOT NULL AND year IS NOT NULL
+GROUP BY employee_id
+ON CONFLICT (employee_id) DO UPDATE SET latest_year = EXCLUDED.latest_year;
+
+DELETE FROM employee_latest_year l
+WHERE NOT EXISTS (SELECT 1 FROM performance_yearly y
+                  WHERE y.employee_id = l.employee_id AND y.year IS NOT NULL);
+
+-- 4) Fresh statistics for the planner
+ANALYZE competencies_yearly;
+ANALYZE performance_yearly;
+ANALYZE papi_scores;
+ANALYZE profiles_psych;
+ANALYZE strengths;
+ANALYZE employees;
+ANALYZE employee_latest_year;
@@ -0,0 +1,78 @@
+-- Documentation SQL Baselines and Distributions
+-- Benchmark baselines (the view's `baseline` CTE: PERCENTILE_DISC(0.5) of the
+-- benchmark employees' scores per TV) and workforce-wide per-TV score
+-- distributions, computed once per benchmark / data refresh and stored, so
+-- consumers join a small lookup table instead of re-aggregating the
+-- population. Filled by talent_match/baselines.py (on every result-store
+-- refresh, or: python -m talent_match.baselines --dsn ...). Safe to re-run.
+-- Rows carry the data version (talent_source_version.version, doc 5) they
+-- were computed from; readers use them only for exactly the current version, and
+-- a refresh scores from the stored baseline when its state matches.
+
+-- 1) Baseline per job_vacancy_id x TV. A row exists for every TV that has a
+--    tv_all row for at least one benchmark employee (baseline_score NULL when
+--    all their scores are NULL), exactly like the GROUP BY of the CTE.
+CREATE TABLE IF NOT EXISTS benchmark_baselines (
+  job_vacancy_id INT     NOT NULL REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE,
+  tgv_name       TEXT    NOT NULL,
+  tv_name        TEXT    NOT NULL,
+  baseline_score NUMERIC,
+  PRIMARY KEY (job_vacancy_id, tgv_name, tv_name)
+);
+
+CREATE TABLE IF NOT EXISTS benchmark_baseline_state (
+  job_vacancy_id      INT PRIMARY KEY REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE,
+  selected_talent_ids TEXT[]      NOT NULL,   -- benchmark employees the baseline was built from
+  source_version      BIGINT,                 -- talent_source_version.version covered (NULL: unknown)
+  computed_at         TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+-- 2) Workforce distribution per TV (employees in `employees` with a non-NULL
+--    score). quantiles[i + 1] is the i-th percentile, i = 0..100.
+CREATE TABLE IF NOT EXISTS tv_distributions (
+  tgv_name       TEXT      NOT NULL,
+  tv_name        TEXT      NOT NULL,
+  direction      TEXT      NOT NULL,           -- 'higher' | 'lower' is better
+  n              INT       NOT NULL,
+  min_score      NUMERIC,
+  max_score      NUMERIC,
+  mean_score     NUMERIC,
+  p10            NUMERIC,
+  p25            NUMERIC,
+  p50            NUMERIC,
+  p75            NUMERIC,
+  p90            NUMERIC,
+  quantiles      NUMERIC[] NOT NULL,
+  source_version BIGINT,
+  computed_at    TIMESTAMPTZ NOT NULL DEFAULT now(),
+  PRIMARY KEY (tgv_name, tv_name)
+);
+
+-- 3) Percentile rank of a score against the stored distribution: the mid-rank
+--    over the 101 quantile points, flipped for lower-is-better TVs, so
+--    "P92 on GTQ" means the score is at least as good as ~92% of the workforce.
+CREATE OR REPLACE FUNCTION tv_percentile_rank(p_tgv_name TEXT, p_tv_name TEXT, p_score NUMERIC)
+RETURNS NUMERIC
+LANGUAGE sql STABLE AS $$
+  SELECT CASE WHEN d.direction = 'lower' THEN 100 - r.pct ELSE r.pct END
+  FROM tv_distributions d
+  CROSS JOIN LATERAL (
+    SELECT GREATEST(0, LEAST(100,
+             (COUNT(*) FILTER (WHERE q < p_score) + COUNT(*) FILTER (WHERE q <= p_score) - 1) / 2.0
+           )) AS pct
+    FROM unnest(d.quantiles) AS q
+  ) r
+  WHERE d.tgv_name = p_tgv_name AND d.tv_name = p_tv_name AND p_score IS NOT NULL
+$$;
+
+-- Example: TV rows of one stored result with the workforce percentile
+--   SELECT r.employee_id, r.tv_name, r.user_score,
+--          ROUND(tv_percentile_rank(r.tgv_name, r.tv_name, r.user_score)) AS percentile
+--   FROM benchmark_match_results r
+--   WHERE r.job_vacancy_id = 1 AND r.employee_id = 'EMP100012';
+--
+-- Example: scoring against the stored baseline is a join on the lookup table
+--   SELECT t.employee_id, t.tv_name, t.user_score, b.baseline_score
+--   FROM tv_all t
+--   JOIN benchmark_baselines b
+--     ON b.job_vacancy_id = 1 AND b.tgv_name = t.tgv_name AND b.tv_name = t.tv_name;
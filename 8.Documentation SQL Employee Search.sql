@@ -0,0 +1,47 @@
+-- Documentation SQL Employee Search
+-- Indexes behind the benchmark form's employee picker (talent_match/search.py):
+-- the app sends the typed text and filters and gets back the top ~20 matches,
+-- so nothing on the page scales with headcount. Safe to re-run.
+-- Apply and check the plans:
+--   python -m talent_match.search --dsn ... --apply --query "dimas" --explain
+
+-- 1) Prefix search on the name and the ID (LIKE 'dim%' / LIKE 'EMP1000%').
+--    text_pattern_ops makes LIKE prefixes indexable under any collation.
+CREATE INDEX IF NOT EXISTS ix_employees_fullname_prefix
+  ON employees (lower(fullname) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS ix_employees_id_prefix
+  ON employees (employee_id text_pattern_ops);
+
+-- 2) Browsing without text (filters only): first names in order
+CREATE INDEX IF NOT EXISTS ix_employees_fullname_order
+  ON employees (lower(fullname), employee_id);
+
+-- 3) Directorate / grade filters
+CREATE INDEX IF NOT EXISTS ix_employees_directorate_grade
+  ON employees (directorate_id, grade_id);
+
+-- 4) Type-ahead anywhere in the name ("halim" -> "Dimas Halim", typos
+--    included) via trigrams, when the pg_trgm extension can be installed.
+--    Without it the picker falls back to the prefix indexes above.
+DO $$
+BEGIN
+  IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+    CREATE EXTENSION IF NOT EXISTS pg_trgm;
+    EXECUTE 'CREATE INDEX IF NOT EXISTS ix_employees_fullname_trgm
+               ON employees USING gin (lower(fullname) gin_trgm_ops)';
+  ELSE
+    RAISE NOTICE 'pg_trgm is not available: employee search uses prefix matching only';
+  END IF;
+END
+$$;
+
+-- Example: what the picker runs for "dim" in directorate 2 (trigram variant)
+--   SELECT e.employee_id, e.fullname
+--   FROM employees e
+--   WHERE (lower(e.fullname) LIKE 'dim%' OR e.employee_id LIKE 'DIM%'
+--          OR lower(e.fullname) LIKE '%dim%' OR 'dim' <% lower(e.fullname))
+--     AND e.directorate_id IN (2)
+--   ORDER BY (lower(e.fullname) LIKE 'dim%') DESC,
+--            word_similarity('dim', lower(e.fullname)) DESC, lower(e.fullname)
+--   LIMIT 20;
@@ -0,0 +1,72 @@
+-- Documentation SQL Job Queue
+-- Persisted background jobs for the app's "save & score benchmark" work
+-- (talent_match/jobs.py). The Streamlit script only enqueues a row; worker
+-- threads in the app process (or python -m talent_match.jobs) claim it, report
+-- progress into the row and record the result, so a page refresh or a second
+-- browser tab just reads the row again. Safe to re-run.
+
+CREATE TABLE IF NOT EXISTS benchmark_jobs (
+  job_id         BIGSERIAL   PRIMARY KEY,
+  kind           TEXT        NOT NULL,                  -- handler name, e.g. 'save_and_score'
+  dedupe_key     TEXT        NOT NULL,                  -- sha256 of kind + canonical payload
+  payload        JSONB       NOT NULL,
+  status         TEXT        NOT NULL DEFAULT 'queued'
+                 CHECK (status IN ('queued', 'running', 'done', 'failed')),
+  progress       REAL        NOT NULL DEFAULT 0,        -- 0..1
+  message        TEXT,
+  job_vacancy_id INT REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE,  -- set once the benchmark row exists
+  result         JSONB,
+  error          TEXT,
+  attempts       INT         NOT NULL DEFAULT 0,
+  session_id     TEXT,                                  -- submitting app session (informational)
+  worker         TEXT,                                  -- host:pid:thread of the claiming worker
+  created_at     TIMESTAMPTZ NOT NULL DEFAULT now(),
+  started_at     TIMESTAMPTZ,
+  heartbeat_at   TIMESTAMPTZ,
+  finished_at    TIMESTAMPTZ
+);
+
+-- 0) Tables created before the foreign key: drop jobs whose benchmark is gone
+--    (e.g. a reload that reused the ids, so an old ?jobs= link would open the
+--    wrong benchmark), then add it
+DO $$
+BEGIN
+  IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'benchmark_jobs_job_vacancy_id_fkey') THEN
+    DELETE FROM benchmark_jobs j
+    WHERE j.job_vacancy_id IS NOT NULL
+      AND NOT EXISTS (SELECT 1 FROM talent_benchmarks tb WHERE tb.job_vacancy_id = j.job_vacancy_id);
+    ALTER TABLE benchmark_jobs
+      ADD CONSTRAINT benchmark_jobs_job_vacancy_id_fkey
+      FOREIGN KEY (job_vacancy_id) REFERENCES talent_benchmarks(job_vacancy_id) ON DELETE CASCADE;
+  END IF;
+END $$;
+
+-- 1) At most one queued/running job per identical request: a second submit
+--    (double click, another tab, another user) attaches to the in-flight job
+CREATE UNIQUE INDEX IF NOT EXISTS ux_benchmark_jobs_inflight
+  ON benchmark_jobs (dedupe_key)
+  WHERE status IN ('queued', 'running');
+
+-- 2) Claiming: oldest queued job first
+CREATE INDEX IF NOT EXISTS ix_benchmark_jobs_queued
+  ON benchmark_jobs (created_at, job_id)
+  WHERE status = 'queued';
+
+-- 3) Stale running jobs (worker died) and the running count
+CREATE INDEX IF NOT EXISTS ix_benchmark_jobs_running
+  ON benchmark_jobs (heartbeat_at)
+  WHERE status = 'running';
+
+-- Example: claim the next job (what a worker runs, serialized by an advisory
+-- lock so the global cap on running jobs holds across processes)
+--   SELECT pg_advisory_xact_lock(9, 0);
+--   UPDATE benchmark_jobs SET status = 'running', attempts = attempts + 1,
+--          started_at = now(), heartbeat_at = now()
+--   WHERE job_id = (SELECT job_id FROM benchmark_jobs WHERE status = 'queued'
+--                   ORDER BY created_at, job_id LIMIT 1 FOR UPDATE SKIP LOCKED)
+--     AND (SELECT COUNT(*) FROM benchmark_jobs WHERE status = 'running') < 2
+--   RETURNING *;
+--
+-- Example: queue overview
+--   SELECT status, COUNT(*), MAX(now() - created_at) AS oldest
+--   FROM benchmark_jobs GROUP BY status;
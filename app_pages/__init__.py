@@ -0,0 +1,51 @@
+"""Pages of the Streamlit app, each imported the first time it is opened.
+
+app.py used to run every section top to bottom on each rerun: a DB ping, the
+recent-benchmarks query and the employee picker before the user had done
+anything, with everything any section might need imported up front
+(requests for the AI profile, plotly for the radar). It now only builds an
+``st.navigation`` over these pages. A page module is imported when its page
+is first shown (it then stays in ``sys.modules``) and runs only its own
+queries:
+
+* ``benchmark``  create a benchmark (landing page; no query until the user searches)
+* ``saved``      re-run a saved benchmark
+* ``dashboard``  ranked list, distribution, candidate detail and radar (plotly)
+* ``profile``    AI-generated job profile (requests, via talent_match.ai_profile)
+* ``compare``    several benchmarks side by side
+* ``database``   connectivity check and sample data
+
+Shared resources (pooled database, caches, TV matrix, run_matching) live in
+``app_pages.common``. ``benchmarks/bench_startup.py`` measures cold start and
+first render per page.
+"""
+import importlib
+
+import streamlit as st
+
+# url path -> (module, title, icon); the first entry is the landing page
+PAGES = {
+    "benchmark": ("app_pages.benchmark", "New benchmark", "🧩"),
+    "saved": ("app_pages.saved", "Saved benchmarks", "🔎"),
+    "dashboard": ("app_pages.dashboard", "Dashboard", "📊"),
+    "profile": ("app_pages.job_profile", "AI job profile", "🧠"),
+    "compare": ("app_pages.compare", "Compare benchmarks", "🧮"),
+    "database": ("app_pages.database", "Database", "🔌"),
+}
+LANDING_PAGE = next(iter(PAGES))
+
+
+def page(name, perf=None):
+    """``st.Page`` for ``name``: imports its module on first render and runs ``render(perf)``."""
+    module, title, icon = PAGES[name]
+
+    def run():
+        perf.call(f"load_page_{name}", importlib.import_module, module).render(perf)
+
+    return st.Page(run, title=title, icon=icon, url_path=name, default=name == LANDING_PAGE)
+
+
+def open_page(name, perf):
+    """Switch to another page, e.g. the dashboard once a ranking is loaded."""
+    perf.finish()  # st.switch_page() ends this run before the end of the script
+    st.switch_page(page(name, perf))
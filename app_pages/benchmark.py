@@ -0,0 +1,170 @@
+"""New benchmark: employee picker, benchmark form and this session's background jobs.
+
+The landing page, so its first render runs no query: the picker searches
+only once the user types or picks a filter, and the job queue is only
+looked up when the session has submitted something.
+"""
+import streamlit as st
+
+from app_pages import open_page
+from app_pages.common import (
+    CACHE_TTL, get_engine, get_job_runner, get_query_cache, get_read_engine, run_matching,
+)
+from talent_match.cache import cached_read_sql
+from talent_match.jobs import benchmark_payload, get_jobs, save_benchmark
+from talent_match.search import DIRECTORATES_SQL, GRADES_SQL, SEARCH_LIMIT, employee_labels, search_sql, trigram_available
+from talent_match.weights import TGV_WEIGHTS, parse_weights, weights_config
+
+
+# Employee picker: the typed text and filters go to Postgres (talent_match/search.py)
+# and only the top matches come back, so the page does not grow with headcount
+@st.cache_resource
+def has_trigram_search():
+    try:
+        return trigram_available(get_read_engine())
+    except Exception:
+        return False
+
+
+def search_employee_options(query, directorate_ids, grade_ids):
+    sql, params = search_sql(query, directorate_ids, grade_ids, trigram=has_trigram_search())
+    found = cached_read_sql(get_query_cache(), get_read_engine(), sql, params,
+                            ttl=CACHE_TTL["emp_search"], tags=("employees",))
+    return employee_labels(found)
+
+
+def keep_bench_picks(option_ids):
+    """Picks survive new searches: the multiselect only holds the current matches."""
+    st.session_state["bench_picks"] = {
+        label: option_ids[label] for label in st.session_state["select_bench_emps"]
+    }
+
+
+def render_jobs(job_ids):
+    """Status of this session's jobs; finished ones rerun the app so it can open them."""
+    job_list = get_jobs(get_engine().options(label="jobs"), job_ids[-5:])
+    for job in job_list:
+        if job.status in ("queued", "running"):
+            st.progress(job.progress, text=f"Job #{job.job_id} • {job.status} • {job.message or 'waiting for a worker'}")
+        elif job.status == "done":
+            result = job.result or {}
+            st.caption(
+                f"✅ Job #{job.job_id} • benchmark {job.job_vacancy_id} scored "
+                f"({result.get('rows', 0)} rows, {result.get('seconds', 0):.1f} s)"
+            )
+        else:
+            st.error(f"Job #{job.job_id} failed: {job.error}")
+    if any(j.finished and j.job_id not in st.session_state["jobs_opened"] for j in job_list):
+        get_query_cache().invalidate("benchmarks")  # the new benchmark shows up on the saved page
+        st.rerun(scope="app")
+    return job_list
+
+
+def render_picker(perf):
+    col_q, col_filter = st.columns([3, 1])
+    emp_query = col_q.text_input("Search benchmark employees (name or ID)", placeholder="e.g., Dimas or EMP1000",
+                                 key="emp_query")
+    dir_ids, grade_ids = [], []
+    # the filter lists are only read when asked for
+    if col_filter.toggle("Directorate / grade filters", key="emp_filters"):
+        query_cache, read_engine = get_query_cache(), get_read_engine()
+        directorates = cached_read_sql(query_cache, read_engine, DIRECTORATES_SQL, ttl=CACHE_TTL["employees"], tags=("employees",))
+        grades = cached_read_sql(query_cache, read_engine, GRADES_SQL, ttl=CACHE_TTL["employees"], tags=("employees",))
+        col_dir, col_grade = st.columns(2)
+        dir_pick = col_dir.multiselect("Directorate", directorates["name"].tolist(), key="emp_directorates")
+        grade_pick = col_grade.multiselect("Grade", grades["name"].tolist(), key="emp_grades")
+        dir_ids = directorates.loc[directorates["name"].isin(dir_pick), "directorate_id"].tolist()
+        grade_ids = grades.loc[grades["name"].isin(grade_pick), "grade_id"].tolist()
+    searching = bool(emp_query.strip() or dir_ids or grade_ids)
+    emp_matches = perf.call("employee_search", search_employee_options, emp_query, dir_ids, grade_ids) if searching else {}
+    bench_picks = st.session_state["bench_picks"]
+    emp_options = {**bench_picks, **emp_matches}
+    st.multiselect(
+        "Select up to 3 benchmark employees",
+        options=list(emp_options),
+        default=list(bench_picks),
+        max_selections=3,
+        key="select_bench_emps",
+        on_change=keep_bench_picks,
+        args=(emp_options,),
+    )
+    if searching:
+        st.caption(
+            f"{len(emp_matches)} match(es) shown (top {SEARCH_LIMIT}"
+            f"{'' if has_trigram_search() else ', name/ID prefix'}); refine the search or filters to find others"
+        )
+    else:
+        st.caption("Type a name or ID, or turn on the filters, to list employees.")
+
+
+def submit_benchmark(perf, role_name, job_level, role_purpose, tgv_weight_inputs):
+    selected_ids = list(st.session_state["bench_picks"].values())
+    custom = {tgv: w for tgv, w in tgv_weight_inputs.items() if w != TGV_WEIGHTS[tgv]}
+    bench_weights = weights_config(custom)
+    parse_weights(bench_weights)  # reject all-zero weights before saving
+    payload = benchmark_payload(role_name, job_level, role_purpose, selected_ids, bench_weights)
+    runner = get_job_runner()
+    if runner is not None:
+        # queued: the session stays responsive and a refresh keeps the job
+        with perf.stage("save_benchmark"):
+            job, created = runner.submit("save_and_score", payload, st.session_state["perf_session"])
+        if job.job_id not in st.session_state["bench_jobs"]:
+            st.session_state["bench_jobs"].append(job.job_id)
+        st.query_params["jobs"] = ",".join(str(j) for j in st.session_state["bench_jobs"][-5:])
+        if created:
+            st.success(f"Benchmark queued as job #{job.job_id}; results open on the dashboard when it finishes.")
+        else:
+            st.info(f"An identical benchmark is already being scored (job #{job.job_id}); following it.")
+        return
+    with perf.stage("save_benchmark"), get_engine().begin() as conn:
+        new_id = save_benchmark(conn, payload)
+    get_query_cache().invalidate("benchmarks")
+    perf.call("run_matching", run_matching, new_id, st.session_state["top_k"])
+    open_page("dashboard", perf)
+
+
+def render_jobs_block(perf):
+    """Poll while any job is in flight; open the newest finished one on the dashboard."""
+    try:
+        get_job_runner()  # also picks up jobs queued before a restart of this process
+        job_list = perf.call("jobs", get_jobs, get_engine().options(label="jobs"), st.session_state["bench_jobs"][-5:])
+        newly_done = [j for j in job_list if j.status == "done" and j.job_id not in st.session_state["jobs_opened"]]
+        st.session_state["jobs_opened"].update(j.job_id for j in job_list if j.finished)
+        if newly_done:
+            perf.call("run_matching", run_matching, newly_done[0].job_vacancy_id, st.session_state["top_k"])
+            open_page("dashboard", perf)
+        in_flight = any(not j.finished for j in job_list)
+        (st.fragment(run_every=2)(render_jobs) if in_flight else render_jobs)(st.session_state["bench_jobs"])
+    except Exception as e_jobs:
+        st.warning(f"Job status unavailable: {e_jobs}")
+
+
+def render(perf):
+    st.header("Create a new Job Benchmark")
+    render_picker(perf)
+
+    with st.form("benchmark_form", clear_on_submit=False):
+        col1, col2 = st.columns(2)
+        role_name = col1.text_input("Role name", placeholder="e.g., Brand Executive")
+        job_level = col2.text_input("Job level / grade", placeholder="e.g., V")
+        role_purpose = st.text_area("Role purpose (1–2 sentences)")
+        with st.expander("TGV weights (optional)"):
+            st.caption("Relative importance of each TGV in the final match rate; normalized to 100%.")
+            weight_cols = st.columns(len(TGV_WEIGHTS))
+            tgv_weight_inputs = {
+                tgv: weight_cols[i].number_input(tgv, min_value=0.0, max_value=1.0, value=w, step=0.05, key=f"w_{tgv}")
+                for i, (tgv, w) in enumerate(TGV_WEIGHTS.items())
+            }
+        submitted = st.form_submit_button("Save benchmark & run matching")
+
+    if submitted:
+        if not role_name or not job_level or not role_purpose or len(st.session_state["bench_picks"]) == 0:
+            st.error("Please fill all fields and select at least 1 benchmark employee.")
+        else:
+            try:
+                submit_benchmark(perf, role_name, job_level, role_purpose, tgv_weight_inputs)
+            except Exception as e:
+                st.error(f"Ranking query failed: {e}")
+
+    if st.session_state["bench_jobs"]:
+        render_jobs_block(perf)
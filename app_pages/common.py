@@ -0,0 +1,288 @@
+"""Process-wide resources and session state shared by the app's pages.
+
+Everything here is created on first use: importing this module opens no
+connection, and a page that never queries never touches Postgres.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from talent_match.cache import QueryCache, cached_read_sql
+from talent_match.db import Database, PoolSettings
+from talent_match.matching import candidate_detail, fetch_benchmark, load_tv_matrix, page_cursor, score_benchmark
+from talent_match.perf import PerfRegistry, db_prometheus_lines
+from talent_match.ranked import rank_benchmark, ranking_key
+from talent_match.store import load_candidate_detail, load_top_candidates, refresh_benchmark, store_available
+from talent_match.weights import parse_weights
+
+# Shared read cache: a rerun that changes nothing should not touch Postgres.
+# TTLs in seconds per query; "benchmarks" entries are dropped on INSERT.
+CACHE_TTL = {"ping": 300, "peek": 60, "recent_bm": 120, "employees": 900, "emp_search": 60}
+# Probes of the optional SQL objects (docs 5 / 9), in seconds: a missing table
+# or a failed lookup is not repeated on every rerun and fragment tick, and
+# objects installed later are picked up without a restart
+PROBE_TTL = 60
+
+RECENT_BENCHMARKS_SQL = """
+SELECT job_vacancy_id, role_name, job_level, created_at
+FROM talent_benchmarks
+ORDER BY job_vacancy_id DESC
+LIMIT 25
+"""
+
+
+# -----------------------------
+# Database
+# -----------------------------
+def database_urls():
+    """``(primary, replica)`` URLs from the DB_* secrets; a ``DATABASE_URL`` secret overrides the primary."""
+    override = st.secrets.get("DATABASE_URL")
+    if override:
+        return override, None
+    host = st.secrets["DB_HOST"]
+    name = st.secrets["DB_NAME"]
+    user = st.secrets["DB_USER"]
+    pwd = st.secrets["DB_PASSWORD"]
+    port = st.secrets.get("DB_PORT", "5432")
+    ssl_mode = "require"
+    primary = f"postgresql+psycopg2://{user}:{pwd}@{host}:{port}/{name}?sslmode={ssl_mode}"
+    replica_host = st.secrets.get("DB_REPLICA_HOST")
+    replica = (
+        f"postgresql+psycopg2://{user}:{pwd}@{replica_host}:{st.secrets.get('DB_REPLICA_PORT', port)}/{name}?sslmode={ssl_mode}"
+        if replica_host else None
+    )
+    return primary, replica
+
+
+# One pooled Database per process (talent_match/db.py): pool size, pre-ping and
+# the default statement timeout come from DB_POOL_* / DB_STATEMENT_TIMEOUT_MS.
+# Engines connect lazily, so creating it costs no round trip.
+@st.cache_resource
+def get_database():
+    return Database(*database_urls(), PoolSettings.from_mapping(st.secrets))
+
+
+def get_engine():
+    """Primary: writes and everything feeding the result store."""
+    return get_database().primary
+
+
+def get_read_engine():
+    """Read-only dashboard queries (the replica when DB_REPLICA_HOST is set)."""
+    return get_database().replica.options(timeout_ms=5_000, label="dashboard")
+
+
+@st.cache_resource
+def get_query_cache():
+    return QueryCache(max_entries=256)
+
+
+# -----------------------------
+# Per-rerun profile and session state
+# -----------------------------
+# Per-rerun stage timings (talent_match/perf.py): wall time, rows and bytes per
+# section, folded into process-wide histograms at the end of the script
+@st.cache_resource
+def get_perf_registry():
+    return PerfRegistry(
+        jsonl_path=st.secrets.get("PERF_LOG_PATH"),
+        prom_path=st.secrets.get("PERF_PROM_PATH"),
+        collectors=[lambda: db_prometheus_lines(get_database().stats())],
+    )
+
+
+def start_rerun():
+    if "perf_session" not in st.session_state:
+        st.session_state["perf_session"] = os.urandom(4).hex()
+    return get_perf_registry().start_rerun(st.session_state["perf_session"])
+
+
+def init_state():
+    """Persisted state, so results survive reruns and page switches."""
+    if "top_k" not in st.session_state:
+        st.session_state["top_k"] = 100  # candidates loaded per page (K)
+    if "latest_top_df" not in st.session_state:
+        st.session_state["latest_top_df"] = pd.DataFrame()
+    if "latest_cursor" not in st.session_state:
+        st.session_state["latest_cursor"] = None
+    if "candidate_detail" not in st.session_state:
+        st.session_state["candidate_detail"] = {}
+    if "latest_bench_id" not in st.session_state:
+        st.session_state["latest_bench_id"] = None
+    if "latest_store_status" not in st.session_state:
+        st.session_state["latest_store_status"] = None
+    if "latest_ranking" not in st.session_state:
+        st.session_state["latest_ranking"] = None
+    if "latest_loaded" not in st.session_state:
+        st.session_state["latest_loaded"] = 0
+    if "tgv_summary" not in st.session_state:
+        st.session_state["tgv_summary"] = {}
+    if "compare_ids" not in st.session_state:
+        st.session_state["compare_ids"] = None
+    if "bench_picks" not in st.session_state:
+        st.session_state["bench_picks"] = {}  # picker label -> employee_id
+    if "bench_jobs" not in st.session_state:
+        # this session's background jobs; mirrored in ?jobs= so a page refresh finds them again
+        st.session_state["bench_jobs"] = [int(j) for j in st.query_params.get("jobs", "").split(",") if j.isdigit()]
+    if "jobs_opened" not in st.session_state:
+        st.session_state["jobs_opened"] = set()
+
+
+def recent_benchmarks(perf):
+    """Last 25 saved benchmarks (saved and compare pages).
+
+    Read from the primary: right after an insert invalidates "benchmarks", a
+    lagging replica could put the old list back in the cache for its TTL.
+    """
+    return perf.call(
+        "recent_benchmarks",
+        cached_read_sql,
+        get_query_cache(),
+        get_engine().options(timeout_ms=5_000, label="dashboard"),
+        RECENT_BENCHMARKS_SQL,
+        ttl=CACHE_TTL["recent_bm"],
+        tags=("benchmarks",),
+    )
+
+
+# =====================================================================
+# Matching: run a benchmark and persist it to session_state
+# =====================================================================
+# The TV score matrix is loaded once per source-data version and shared across
+# sessions; each benchmark is then scored in-process instead of through
+# v_benchmark_matching.
+@st.cache_resource(ttl=600, max_entries=2, show_spinner="Loading TV scores...")
+def get_tv_matrix(data_version=None):
+    # the store stamps rows with the primary's data version: no replica lag there
+    source = get_engine() if has_result_store() else get_database().replica
+    matrix = load_tv_matrix(source.options(timeout_ms=120_000, label="tv_matrix"))
+    # rankings and comparisons reference their matrix: drop them so an expired
+    # or evicted matrix is freed instead of staying alive in the ranking cache
+    get_ranking_cache().invalidate()
+    return matrix
+
+
+# Compact rankings (talent_match/ranked.py), one per benchmark + matrix token,
+# shared read-only by every session that opens the benchmark
+@st.cache_resource
+def get_ranking_cache():
+    return QueryCache(max_entries=32, default_ttl=600)
+
+
+@st.cache_resource(ttl=PROBE_TTL)
+def has_result_store():
+    # a transient error falls back to in-process scoring for PROBE_TTL seconds
+    # only, instead of disabling the store until the process restarts
+    try:
+        return store_available(get_engine())
+    except Exception:
+        return False
+
+
+def run_matching(bench_id: int, k: int, after=None):
+    """Employee-level top-K page; TV rows are fetched per candidate on demand."""
+    engine = get_engine()
+    bench_ids, bench_weights = fetch_benchmark(engine, bench_id)
+    if has_result_store():
+        # Materialized rows: recompute only what changed, then one indexed lookup
+        if after is None:
+            st.session_state["latest_store_status"] = refresh_benchmark(
+                engine.options(timeout_ms=120_000, label="store_refresh"), bench_id, get_tv_matrix
+            )
+        page = load_top_candidates(engine.options(label="top_page"), bench_id, k, after)
+        top_df = page if after is None else pd.concat([st.session_state["latest_top_df"], page], ignore_index=True)
+        st.session_state["latest_ranking"] = None
+        st.session_state["latest_cursor"] = page_cursor(page, k)
+        st.session_state["latest_top_df"] = top_df
+    else:
+        # The session keeps a reference to the shared ranking and how many
+        # candidates it has loaded; pages are rebuilt from it on each rerun
+        st.session_state["latest_store_status"] = None
+        matrix = get_tv_matrix()
+        ranking = get_ranking_cache().get_or_load(
+            ranking_key(matrix, bench_id, bench_ids, bench_weights),
+            lambda: rank_benchmark(matrix, bench_ids, bench_weights, bench_id),
+        )
+        loaded = k if after is None else st.session_state["latest_loaded"] + k
+        top_df = ranking.head(loaded)
+        st.session_state["latest_ranking"] = ranking
+        st.session_state["latest_loaded"] = loaded
+        st.session_state["latest_cursor"] = page_cursor(top_df, loaded)
+        st.session_state["latest_top_df"] = pd.DataFrame()
+    if after is None:
+        st.session_state["candidate_detail"] = {}
+        st.session_state["tgv_summary"] = {}
+    st.session_state["latest_bench_id"] = bench_id
+    st.session_state["latest_weights"] = parse_weights(bench_weights)[0]
+    return top_df
+
+
+def current_top_df():
+    """Loaded candidates of the session's benchmark (shared ranking or store pages)."""
+    ranking = st.session_state.get("latest_ranking")
+    if ranking is not None:
+        return ranking.head(st.session_state["latest_loaded"])
+    return st.session_state.get("latest_top_df", pd.DataFrame())
+
+
+def get_candidate_detail(bench_id: int, employee_id):
+    """TV rows of one candidate, fetched the first time it is opened on the dashboard."""
+    ranking = st.session_state.get("latest_ranking")
+    if ranking is not None and ranking.bench_id == bench_id:
+        return ranking.detail(employee_id)  # one matrix row, no per-session copy
+    cache = st.session_state["candidate_detail"]
+    if (bench_id, employee_id) not in cache:
+        if has_result_store():
+            detail = load_candidate_detail(get_engine(), bench_id, employee_id)
+        else:
+            matrix = get_tv_matrix()
+            result = score_benchmark(matrix, *fetch_benchmark(get_engine(), bench_id))
+            detail = candidate_detail(matrix, result, employee_id)
+        cache[(bench_id, employee_id)] = detail
+    return cache[(bench_id, employee_id)]
+
+
+# Background "save & score" jobs (talent_match/jobs.py): persisted in
+# benchmark_jobs, run by a few worker threads per process with a global cap on
+# running jobs; None when the queue table is not installed (scored inline)
+def publish_ranking(matrix, bench_id, ids, weights):
+    return get_ranking_cache().get_or_load(
+        ranking_key(matrix, bench_id, ids, weights),
+        lambda: rank_benchmark(matrix, ids, weights, bench_id),
+    )
+
+
+@st.cache_resource(ttl=PROBE_TTL)
+def job_queue_installed():
+    from talent_match.jobs import jobs_available
+
+    try:
+        return jobs_available(get_engine())
+    except Exception:
+        return False
+
+
+def get_job_runner():
+    """The process-wide JobRunner; None while benchmark_jobs is not installed."""
+    if not job_queue_installed():
+        return None
+    try:
+        return start_job_runner()
+    except Exception:
+        return None
+
+
+@st.cache_resource
+def start_job_runner():
+    from talent_match.jobs import MAX_RUNNING, JobRunner, make_scorer, save_and_score
+
+    engine = get_engine()
+    job_engine = engine.options(timeout_ms=300_000, label="job")
+    scorer = make_scorer(job_engine, get_matrix=get_tv_matrix, publish=publish_ranking)
+    return JobRunner(
+        job_engine,
+        {"save_and_score": save_and_score(scorer)},
+        workers=int(st.secrets.get("JOB_WORKERS", 2)),
+        max_running=int(st.secrets.get("JOB_MAX_RUNNING", MAX_RUNNING)),
+    ).start()
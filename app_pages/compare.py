@@ -0,0 +1,80 @@
+"""Compare several benchmarks: one pass over the TV matrix, best-fit vacancy per employee."""
+import pandas as pd
+import streamlit as st
+
+from app_pages.common import current_top_df, get_engine, get_ranking_cache, get_tv_matrix, recent_benchmarks
+from talent_match.compare import compare_benchmarks, comparison_key, fetch_benchmarks
+
+
+# Several benchmarks scored in one pass over the matrix (talent_match/compare.py),
+# shared like the rankings
+def run_comparison(bench_ids):
+    matrix = get_tv_matrix()
+    # the primary, like the list they were picked from: a new benchmark may not be on the replica yet
+    benchmarks = fetch_benchmarks(get_engine().options(timeout_ms=5_000, label="dashboard"), bench_ids)
+    return get_ranking_cache().get_or_load(
+        comparison_key(matrix, benchmarks),
+        lambda: compare_benchmarks(matrix, benchmarks),
+    )
+
+
+def heat_color(value):
+    """Green heatmap cell, stronger with the match rate (no matplotlib needed)."""
+    if pd.isna(value):
+        return "color: #999999"
+    alpha = min(max((value - 50) / 50, 0.0), 1.0)
+    return f"background-color: rgba(40, 167, 69, {alpha:.2f}); color: {'white' if alpha > 0.6 else 'black'}"
+
+
+def render(perf):
+    st.header("🧮 Compare benchmarks")
+
+    recent_bm = recent_benchmarks(perf)
+    if recent_bm.empty:
+        st.info("No saved benchmarks to compare yet.")
+        return
+    top_df = current_top_df()
+
+    with st.form("compare_benchmarks_form", clear_on_submit=False):
+        compare_pick = st.multiselect(
+            "Benchmarks to compare (2-10)",
+            recent_bm["job_vacancy_id"].tolist(),
+            default=st.session_state["compare_ids"] or recent_bm["job_vacancy_id"].head(3).tolist(),
+            max_selections=10,
+            key="compare_pick",
+        )
+        col_n, col_pool = st.columns([1, 1])
+        compare_top = col_n.number_input("Employees to show", min_value=10, max_value=500, value=50, step=10,
+                                         key="compare_top")
+        compare_loaded = col_pool.checkbox("Only the loaded candidates", value=False, key="compare_loaded",
+                                           disabled=top_df.empty)
+        compare_btn = st.form_submit_button("🧮 Compare")
+
+    if compare_btn:
+        st.session_state["compare_ids"] = list(compare_pick) if len(compare_pick) >= 2 else None
+        if len(compare_pick) < 2:
+            st.warning("Pick at least two benchmarks to compare.")
+
+    if not st.session_state["compare_ids"]:
+        return
+    try:
+        with perf.stage("compare_benchmarks") as stage:
+            comparison = run_comparison(st.session_state["compare_ids"])
+            sort_by = st.selectbox("Sort by", ["best_rate", *comparison.labels], key="compare_sort")
+            pool = top_df["employee_id"].tolist() if compare_loaded and not top_df.empty else None
+            grid = stage.record(comparison.frame(sort_by, limit=int(compare_top), employee_ids=pool))
+        st.caption(
+            f"{len(comparison.bench_ids)} benchmarks x {len(grid)} employees shown • "
+            f"scored in {comparison.seconds * 1000:.0f} ms • click a column header to re-sort"
+        )
+        st.dataframe(
+            grid.style.applymap(heat_color, subset=[*comparison.labels, "best_rate"]).format(
+                "{:.2f}", subset=[*comparison.labels, "best_rate"], na_rep="–"
+            ),
+            use_container_width=True, hide_index=True, height=420,
+        )
+        best_counts = grid["best_fit"].value_counts()
+        if not best_counts.empty:
+            st.markdown(f"🎯 Most common best fit: **{best_counts.index[0]}** ({best_counts.iloc[0]} of {len(grid)})")
+    except Exception as e_cmp:
+        st.warning(f"Comparison skipped due to: {e_cmp}")
@@ -0,0 +1,320 @@
+"""Dashboard of the loaded benchmark: ranked list, distribution, candidate detail and radar."""
+import os
+
+import pandas as pd
+import plotly.graph_objects as go
+import streamlit as st
+
+from app_pages import page
+from app_pages.common import (
+    current_top_df, get_candidate_detail, get_engine, get_read_engine, get_tv_matrix, has_result_store, run_matching,
+)
+from talent_match.baselines import baselines_available, compute_distribution, load_distribution
+from talent_match.export import EXPORT_FORMATS, export_to_tempfile
+from talent_match.matching import CANDIDATE_COLUMNS
+from talent_match.similarity import SimilarityIndex
+from talent_match.store import current_data_version
+from talent_match.weights import parse_weights, reweight
+
+
+# Nearest-neighbour index over TV vectors (talent_match/similarity.py); synced
+# incrementally whenever get_tv_matrix hands out a newer matrix
+@st.cache_resource
+def get_similarity_index():
+    return SimilarityIndex()
+
+
+def find_similar(employee_id, k=10, approximate=False):
+    index = get_similarity_index()
+    index.sync(get_tv_matrix())
+    return index.similar(employee_id, k, approximate=approximate)
+
+
+# Workforce distribution per TV (talent_match/baselines.py): stored quantiles
+# when the baselines tables are installed and stamped with the current data
+# version, else one pass over the TV matrix
+@st.cache_resource(ttl=600, show_spinner=False)
+def get_tv_distribution():
+    try:
+        engine = get_engine()
+        if has_result_store() and baselines_available(engine):
+            stored = load_distribution(get_read_engine(), current_data_version(engine))
+            if stored is not None:
+                return stored
+    except Exception:
+        pass
+    return compute_distribution(get_tv_matrix())
+
+
+def candidate_percentiles(bench_id: int, employee_id):
+    """Candidate TV rows plus the workforce percentile of each score (no population scan)."""
+    cand = get_candidate_detail(bench_id, employee_id)
+    pct = get_tv_distribution().percentile_ranks(cand["tgv_name"], cand["tv_name"], cand["user_score"])
+    return cand.assign(percentile=pd.Series(pct, index=cand.index).round())
+
+
+def color_scale(value):
+    if value >= 90:
+        return "background-color: #28a745; color:white"
+    elif value >= 70:
+        return "background-color: #ffc107"
+    else:
+        return "background-color: #dc3545; color:white"
+
+
+def render_overview(perf, top_df, latest_bench_id, tgv_cols):
+    # ===============================================================
+    # A & B — Overview Section (Top 10 + Distribution)
+    # ===============================================================
+    st.subheader("A) Top 10 Ranked Candidates")
+    top_list = top_df[CANDIDATE_COLUMNS]
+
+    colA, colB = st.columns([1.3, 1])
+
+    with colA:
+        with perf.stage("top_list"):
+            st.dataframe(top_list.head(10), use_container_width=True, height=350)
+
+        # Full, unlimited ranking: produced only on request, streamed in chunks
+        # to a temp file (talent_match/export.py). The file is handed to the
+        # download button in that run only, so later reruns do not read it again.
+        col_fmt, col_prep = st.columns([1, 1])
+        export_fmt = col_fmt.selectbox(
+            "Export format", list(EXPORT_FORMATS), key="export_fmt", label_visibility="collapsed"
+        )
+        if col_prep.button("Prepare full export", key="export_prepare"):
+            try:
+                with st.spinner("Exporting the full ranking..."), perf.stage("export") as stage:
+                    path, rows = export_to_tempfile(
+                        get_engine().options(timeout_ms=300_000, label="export"), latest_bench_id, export_fmt,
+                        ranking=st.session_state.get("latest_ranking"), get_matrix=get_tv_matrix,
+                    )
+                    stage.record(rows=rows, nbytes=os.path.getsize(path))
+                try:
+                    with open(path, "rb") as f:
+                        st.download_button(
+                            f"⬇️ Download full ranking ({rows} rows, {export_fmt.upper()})",
+                            data=f,
+                            file_name=f"benchmark_{latest_bench_id}.{export_fmt}",
+                            mime=EXPORT_FORMATS[export_fmt],
+                            key="dl_full_export",
+                        )
+                finally:
+                    os.remove(path)
+                st.caption("The download is offered until the next interaction; prepare it again after that.")
+            except Exception as e_export:
+                st.error(f"Export failed: {e_export}")
+
+        top_k = st.session_state["top_k"]
+        cursor = st.session_state.get("latest_cursor")
+        if cursor is not None and st.button(f"Load next {top_k} candidates", key="load_more"):
+            perf.call("load_more", run_matching, latest_bench_id, top_k, after=cursor)
+            perf.finish()  # st.rerun() ends this run before the end of the script
+            st.rerun()
+
+    with colB:
+        st.subheader("B) Match-rate Distribution (Top 100)")
+        with perf.stage("distribution_chart"):
+            st.bar_chart(
+                top_list.head(100).set_index("employee_id")["final_match_rate"],
+                use_container_width=True,
+                height=300,
+            )
+
+    # What-if: re-rank the loaded candidates under other TGV weights, in memory
+    if tgv_cols:
+        with st.expander("⚖️ What-if: re-weight TGVs"):
+            st.caption(f"Re-ranks the {len(top_df)} loaded candidates only; the saved benchmark is unchanged.")
+            base_weights = st.session_state.get("latest_weights") or parse_weights()[0]
+            slider_cols = st.columns(len(tgv_cols))
+            whatif_weights = {
+                tgv: slider_cols[i].slider(
+                    tgv, 0.0, 1.0, float(round(base_weights.get(tgv, 0.0), 2)), 0.05,
+                    key=f"whatif_{latest_bench_id}_{tgv}",
+                )
+                for i, tgv in enumerate(tgv_cols)
+            }
+            if sum(whatif_weights.values()) <= 0:
+                st.warning("Set at least one weight above 0.")
+            else:
+                with perf.stage("what_if") as stage:
+                    whatif = top_df[["employee_id", "fullname", "final_match_rate"]].copy()
+                    whatif["whatif_match_rate"] = reweight(top_df, whatif_weights).round(2)
+                    whatif["rank"] = range(1, len(whatif) + 1)
+                    whatif = whatif.sort_values(
+                        ["whatif_match_rate", "employee_id"], ascending=[False, True]
+                    ).reset_index(drop=True)
+                    whatif["rank_change"] = whatif["rank"] - (whatif.index + 1)
+                    stage.record(whatif)
+                st.dataframe(whatif.drop(columns="rank").head(20), use_container_width=True)
+
+
+def render_candidate(perf, top_df, latest_bench_id):
+    # ===============================================================
+    # C — Candidate Detail
+    # ===============================================================
+    emp_list = top_df["employee_id"].tolist()
+    default_emp = st.session_state.get("pick_emp", emp_list[0] if emp_list else None)
+
+    with st.form("compare_candidate_form", clear_on_submit=False):
+        pick_emp = st.selectbox(
+            "Select candidate to inspect",
+            options=emp_list,
+            index=emp_list.index(default_emp) if default_emp in emp_list else 0,
+            key="pick_emp_form",
+        )
+        view_btn = st.form_submit_button("🔍 View Candidate")
+
+    if not (view_btn or st.session_state.get("pick_emp")):
+        return
+    st.session_state["pick_emp"] = pick_emp if view_btn else st.session_state["pick_emp"]
+    chosen_emp = st.session_state["pick_emp"]
+
+    cand = perf.call("candidate_detail", candidate_percentiles, latest_bench_id, chosen_emp)
+    if not cand.empty:
+        styled = cand[["tv_name", "baseline_score", "user_score", "tv_match_rate", "percentile"]] \
+            .sort_values("tv_name") \
+            .style.applymap(color_scale, subset=["tv_match_rate"])
+
+        st.dataframe(styled, use_container_width=True, height=350)
+
+        cand_csv = cand.to_csv(index=False).encode("utf-8")
+        st.download_button(
+            "⬇️ Download candidate TVs (CSV)",
+            data=cand_csv,
+            file_name=f"candidate_{chosen_emp}_tvs.csv",
+            mime="text/csv",
+            key="dl_csv_cand",
+        )
+    else:
+        st.warning("No data found for this candidate.")
+
+    # ============= Find similar employees =============
+    with st.form("find_similar_form", clear_on_submit=False):
+        col_k, col_mode = st.columns([1, 1])
+        similar_k = col_k.number_input("Similar employees (K)", min_value=1, max_value=100, value=10)
+        similar_approx = col_mode.checkbox("Approximate (faster on large workforces)", value=False)
+        similar_btn = st.form_submit_button("🔗 Find similar")
+
+    if similar_btn:
+        st.session_state["similar_to"] = (chosen_emp, int(similar_k), similar_approx)
+    if st.session_state.get("similar_to", (None,))[0] == chosen_emp:
+        _, similar_k, similar_approx = st.session_state["similar_to"]
+        similar_df = perf.call("find_similar", find_similar, chosen_emp, similar_k, similar_approx)
+        if similar_df.empty:
+            st.info("No TV scores on record for this employee.")
+        else:
+            st.caption(f"Most similar TV profiles to {chosen_emp} (cosine similarity)")
+            st.dataframe(similar_df, use_container_width=True, hide_index=True)
+
+
+def render_radar(perf, top_df, latest_bench_id, tgv_cols):
+    # ================= Radar Chart =================
+    chosen_emp = st.session_state.get("pick_emp")
+    if not chosen_emp:
+        st.info("Select a candidate to view radar analysis.")
+        return
+    try:
+        # TGV rates already arrive with the candidate row, no regrouping
+        cand_tgv = perf.call(
+            "radar_data",
+            lambda: top_df.loc[top_df["employee_id"] == chosen_emp, tgv_cols]
+            .melt(var_name="tgv_name", value_name="tgv_match_rate")
+            .dropna()
+            .sort_values("tgv_name"),
+        )
+
+        if cand_tgv.empty:
+            st.info("No TGV data available for this candidate.")
+            return
+        cand_tgv["benchmark_rate"] = 100
+
+        fig = go.Figure()
+        fig.add_trace(
+            go.Scatterpolar(
+                r=cand_tgv["tgv_match_rate"],
+                theta=cand_tgv["tgv_name"],
+                fill="toself",
+                name="Candidate Match Rate",
+                line_color="mediumseagreen",
+                hovertemplate="<b>%{theta}</b><br>Match Rate: %{r:.1f}%<extra></extra>"
+            )
+        )
+        fig.add_trace(
+            go.Scatterpolar(
+                r=cand_tgv["benchmark_rate"],
+                theta=cand_tgv["tgv_name"],
+                fill="toself",
+                name="Benchmark (100%)",
+                line_color="royalblue",
+                line=dict(dash="dot"),
+            )
+        )
+
+        fig.update_layout(
+            polar=dict(radialaxis=dict(visible=True, range=[0, 100])),
+            showlegend=True,
+            height=400,
+            margin=dict(l=30, r=30, t=40, b=30),
+        )
+        with perf.stage("radar_chart"):
+            st.plotly_chart(fig, use_container_width=True)
+
+        # ============ Insight Summary ============
+        avg_tgv = cand_tgv.set_index("tgv_name")["tgv_match_rate"]
+        best_tgv = avg_tgv.idxmax()
+        worst_tgv = avg_tgv.idxmin()
+        strong = avg_tgv[avg_tgv >= 85].index.tolist()
+        weak = avg_tgv[avg_tgv <= 70].index.tolist()
+        cand_pct = candidate_percentiles(latest_bench_id, chosen_emp).dropna(subset=["percentile"])
+        standing = "—"
+        if not cand_pct.empty:
+            top_pct = cand_pct.loc[cand_pct["percentile"].idxmax()]
+            standing = f"P{top_pct['percentile']:.0f} on {top_pct['tv_name']}"
+
+        st.markdown(f"""
+        **🧠 Insight Summary**
+        - 🟢 Strength: **{best_tgv}**
+        - 🔴 Area to Improve: **{worst_tgv}**
+        - 💬 Strong in: {', '.join(strong) if strong else '—'}
+        - ⚠️ Needs improvement in: {', '.join(weak) if weak else '—'}
+        - 📈 Best workforce standing: **{standing}**
+        """)
+    except Exception as e_plot:
+        st.warning(f"Radar chart skipped due to: {e_plot}")
+
+
+def render(perf):
+    st.header("📊 Talent Benchmark Dashboard")
+
+    top_df = perf.call("current_top_df", current_top_df)
+    latest_bench_id = st.session_state.get("latest_bench_id")
+    tgv_cols = [c for c in top_df.columns if c not in CANDIDATE_COLUMNS]
+
+    if top_df.empty:
+        st.info("No benchmark results loaded yet. Create or re-run a benchmark first.")
+        st.page_link(page("benchmark"), label="Create a benchmark", icon="🧩")
+        st.page_link(page("saved"), label="Re-run a saved benchmark", icon="🔎")
+        return
+
+    store_status = st.session_state.get("latest_store_status")
+    if store_status:
+        freshness = {"fresh": "up to date", "full": "rebuilt", "delta": "incrementally updated"}[store_status["mode"]]
+        st.caption(
+            f"Benchmark {latest_bench_id} • results materialized "
+            f"{store_status['refreshed_at']:%Y-%m-%d %H:%M %Z} • "
+            f"data version {store_status['source_version']} "
+            f"({freshness})"
+        )
+    else:
+        st.caption(f"Benchmark {latest_bench_id} • {len(top_df)} candidates loaded")
+
+    render_overview(perf, top_df, latest_bench_id, tgv_cols)
+    st.divider()
+
+    st.subheader("C) Candidate Detail & TGV Radar")
+    colC, colD = st.columns([1, 1.3])
+    with colC:
+        render_candidate(perf, top_df, latest_bench_id)
+    with colD:
+        render_radar(perf, top_df, latest_bench_id, tgv_cols)
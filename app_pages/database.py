@@ -0,0 +1,44 @@
+"""Database page: connectivity check and a sample of the source tables.
+
+These used to run on every first page view; they now run when this page is opened.
+"""
+import streamlit as st
+from sqlalchemy import text
+
+from app_pages.common import CACHE_TTL, get_query_cache, get_read_engine
+from talent_match.cache import cached_read_sql
+
+
+def db_version():
+    with get_read_engine().connect() as con:
+        return con.execute(text("select version()")).scalar()
+
+
+def render(perf):
+    # -----------------------------
+    # 1) Connectivity check
+    # -----------------------------
+    st.subheader("1) Quick ping to database")
+    try:
+        version = perf.call("ping", get_query_cache().get_or_load, "ping", db_version, ttl=CACHE_TTL["ping"])
+        st.success("Connected ✔")
+        st.code(version)
+    except Exception as e:
+        st.error(f"DB connection failed: {e}")
+        return
+
+    # -----------------------------
+    # 2) Sample data peek (isolated)
+    # -----------------------------
+    st.subheader("2) Sample data preview")
+    peek_option = st.selectbox(
+        "Choose source to peek",
+        ["v_benchmark_matching (if created)", "employees"],
+        key="peek_source"
+    )
+    peek_sql = "SELECT * FROM employees LIMIT 10" if "employees" in peek_option else "SELECT * FROM v_benchmark_matching LIMIT 10"
+    try:
+        df_peek = perf.call("peek", cached_read_sql, get_query_cache(), get_read_engine(), peek_sql, ttl=CACHE_TTL["peek"])
+        st.dataframe(df_peek, use_container_width=True)
+    except Exception as e:
+        st.warning(f"Query failed (this is OK if the view doesn't exist yet): {e}")
@@ -0,0 +1,108 @@
+"""AI-generated job profile of the loaded benchmark (OpenRouter via talent_match.ai_profile).
+
+The only page that needs ``requests``: it is imported with this module, on
+first visit, not at app start.
+"""
+import streamlit as st
+
+from app_pages import page
+from app_pages.common import current_top_df, get_candidate_detail
+from talent_match.ai_profile import OPENROUTER_URL, ProfileGenerationError, ProfileGenerator, build_prompt_data
+from talent_match.matching import CANDIDATE_COLUMNS
+
+
+# One AI profile generator per process: pooled HTTP session + completion cache
+@st.cache_resource
+def get_profile_generator(api_key):
+    return ProfileGenerator(api_key, base_url=st.secrets.get("OPENROUTER_BASE_URL", OPENROUTER_URL))
+
+
+def tgv_summary(perf, top_df, tgv_cols):
+    """Best / worst TGV across the loaded candidates; once per loaded page set, reset by run_matching."""
+    summaries = st.session_state["tgv_summary"]
+    if len(top_df) not in summaries:
+        summaries[len(top_df)] = perf.call(
+            "tgv_summary",
+            lambda: top_df[tgv_cols].mean()
+            .rename("avg_tgv_match").rename_axis("tgv_name").reset_index()
+            .sort_values("avg_tgv_match", ascending=False),
+        )
+    return summaries[len(top_df)]
+
+
+def render(perf):
+    st.header("🧠 AI-Generated Job Profile")
+
+    top_df = current_top_df()
+    latest_bench_id = st.session_state.get("latest_bench_id")
+    tgv_cols = [c for c in top_df.columns if c not in CANDIDATE_COLUMNS]
+
+    # === Prevent errors if no data loaded yet ===
+    if top_df.empty or not tgv_cols:
+        st.info("ℹ️ No benchmark results yet. Please create or re-run a benchmark first.")
+        st.page_link(page("benchmark"), label="Create a benchmark", icon="🧩")
+        return
+
+    best, worst = None, None
+    try:
+        summary = tgv_summary(perf, top_df, tgv_cols)
+        if summary.empty:
+            st.info("No TGV summary available for this benchmark yet.")
+        else:
+            best = summary.iloc[0]["tgv_name"]
+            worst = summary.iloc[-1]["tgv_name"]
+
+            st.markdown(
+                f"""
+**Top Strength Area:** `{best}`  
+**Improvement Needed:** `{worst}`  
+_Based on average match rates per TGV across the loaded candidates of benchmark {latest_bench_id}._
+                """
+            )
+    except Exception as e_summary:
+        st.warning(f"⚠️ Skipped TGV summary due to: {e_summary}")
+
+    # ---------------------------------------------------------------
+    # 🧠 AI text generation — detailed English version
+    # ---------------------------------------------------------------
+    api_key = st.secrets.get("OPENROUTER_API_KEY", "")
+    pick_emp = st.session_state.get("pick_emp", None)  # <— safeguard
+
+    if not api_key:
+        st.info("💡 Tip: Set `OPENROUTER_API_KEY` in Streamlit Secrets to enable AI generation.")
+        return
+    generator = get_profile_generator(api_key)
+
+    with st.expander("⚡ Pre-generate profiles for top candidates"):
+        n_prefetch = st.number_input("Top N candidates", min_value=1, max_value=20, value=5, key="prefetch_n")
+        if st.button("Start background generation", key="prefetch_btn"):
+            try:
+                batch = [
+                    build_prompt_data(latest_bench_id, best, worst, emp,
+                                      get_candidate_detail(latest_bench_id, emp))
+                    for emp in top_df["employee_id"].head(int(n_prefetch))
+                ]
+                started = len(perf.call("ai_prefetch", generator.prefetch, batch))
+                st.success(f"Started {started} profile(s); already cached ones were skipped.")
+            except Exception as e_pre:
+                st.warning(f"Pre-generation skipped due to: {e_pre}")
+        st.caption(f"{generator.pending()} profile(s) generating in the background")
+
+    if not pick_emp:
+        st.info("👤 Select a candidate on the Dashboard to generate their AI job profile.")
+        st.page_link(page("dashboard"), label="Open the dashboard", icon="📊")
+        return
+    try:
+        cand_rows = get_candidate_detail(latest_bench_id, pick_emp)
+        if cand_rows.empty:
+            st.info("No data available for the selected candidate.")
+        else:
+            st.caption(f"Candidate {pick_emp}")
+            prompt_data = build_prompt_data(latest_bench_id, best, worst, pick_emp, cand_rows)
+            # Cached profiles render at once; new ones stream token by token
+            with perf.stage("ai_profile") as stage:
+                stage.record(st.write_stream(generator.stream(prompt_data)))
+    except ProfileGenerationError as e_ai:
+        st.warning(f"⚠️ AI call failed ({e_ai.status_code}). Please try again later.")
+    except Exception as e_d:
+        st.warning(f"AI Profile section skipped due to: {e_d}")
@@ -0,0 +1,30 @@
+"""Saved benchmarks: the most recent ones, and re-running one into the dashboard."""
+import streamlit as st
+
+from app_pages import open_page
+from app_pages.common import recent_benchmarks, run_matching
+
+
+def render(perf):
+    st.header("Re-run an existing benchmark")
+    recent_bm = recent_benchmarks(perf)
+    if recent_bm.empty:
+        st.info("No saved benchmarks yet. Create one on the New benchmark page.")
+        return
+    st.dataframe(recent_bm, use_container_width=True, height=220)
+    pick_id = st.selectbox(
+        "Pick a job_vacancy_id to re-run",
+        recent_bm["job_vacancy_id"].tolist(),
+        index=0,
+        key="pick_existing_bm",
+    )
+    if st.button("Run matching for selected benchmark", key="run_existing"):
+        try:
+            top_df_saved = perf.call("run_matching", run_matching, pick_id, st.session_state["top_k"])
+        except Exception as e:
+            st.error(f"Failed to load benchmark {pick_id}: {e}")
+            return
+        if top_df_saved.empty:
+            st.warning("No results for this benchmark. Ensure selected IDs have data.")
+        else:
+            open_page("dashboard", perf)
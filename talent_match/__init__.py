@@ -0,0 +1 @@
+"""Python-side helpers for the Talent Benchmark Matching app."""
@@ -0,0 +1,209 @@
+"""AI job-profile generation (OpenRouter chat completions).
+
+``ProfileGenerator`` keeps one pooled HTTP session, caches completed profiles
+keyed by a hash of the whole ``prompt_data`` + model, streams tokens as they arrive
+(server-sent events), and can pre-generate profiles for several candidates
+concurrently in background threads. ``base_url`` can point at any
+OpenAI-compatible endpoint, e.g. a local stub server in tests.
+"""
+import hashlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from talent_match.cache import QueryCache
+
+OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
+DEFAULT_MODEL = "openai/gpt-4o-mini"
+
+SYSTEM_PROMPT = (
+    "You are an experienced HR analytics writer who prepares professional, "
+    "executive-level job summaries and talent evaluation reports. "
+    "Always respond in fluent, business English."
+)
+
+USER_PROMPT = (
+    "Using the following JSON data, create a comprehensive English job profile. "
+    "Write it in clear Markdown with this structure:\n\n"
+    "## Job Profile Summary\n"
+    "Briefly introduce the role’s purpose and strategic value.\n\n"
+    "### 1. Job Requirements\n"
+    "• Education & Experience\n"
+    "• Technical Skills\n"
+    "• Analytical & Problem-Solving Skills\n"
+    "• Communication & Interpersonal Skills\n"
+    "• Work Ethic & Discipline\n\n"
+    "### 2. Job Description\n"
+    "Group key responsibilities into:\n"
+    "• Data Preparation & Extraction\n"
+    "• Data Analysis & Insight Generation\n"
+    "• Reporting & Visualization\n"
+    "• Strategic Contribution\n"
+    "• Continuous Improvement\n\n"
+    "### 3. Key Competencies\n"
+    "List 5–6 competencies aligned with benchmark traits "
+    "(e.g., Vision 99.6%, Social Intelligence 99.1%, Discipline 97.1%).\n\n"
+    "### 4. Candidate Insights\n"
+    "Explain why the candidate fits this role based on strengths and growth areas.\n\n"
+    "Data:\n{data}"
+)
+
+
+class ProfileGenerationError(RuntimeError):
+    def __init__(self, status_code, message=""):
+        super().__init__(f"AI call failed ({status_code}) {message}".strip())
+        self.status_code = status_code
+
+
+def build_prompt_data(bench_id, tgv_best, tgv_gap, employee_id, cand_rows):
+    """Prompt payload for one candidate from its TV detail rows."""
+    tvs = cand_rows[["tv_name", "tv_match_rate"]]
+    return {
+        "job_vacancy_id": bench_id,
+        "tgv_best": tgv_best,
+        "tgv_gap": tgv_gap,
+        "candidate_id": employee_id,
+        "candidate_top_tvs": tvs.sort_values("tv_match_rate", ascending=False).head(5).to_dict("records"),
+        "candidate_low_tvs": tvs.sort_values("tv_match_rate", ascending=True).head(5).to_dict("records"),
+    }
+
+
+def build_messages(prompt_data):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": USER_PROMPT.format(data=json.dumps(prompt_data, ensure_ascii=False))},
+    ]
+
+
+def profile_key(prompt_data, model):
+    """Everything the prompt is built from: a profile written for another best /
+    gap TGV (other weights, other loaded candidates, new data) is not reused."""
+    payload = json.dumps(prompt_data, sort_keys=True, ensure_ascii=False, default=str)
+    return "profile:" + hashlib.sha256(f"{model}\n{payload}".encode("utf-8")).hexdigest()
+
+
+class ProfileGenerator:
+    def __init__(self, api_key, model=DEFAULT_MODEL, base_url=OPENROUTER_URL, cache=None,
+                 max_workers=4, timeout=90, cache_ttl=24 * 3600):
+        self.api_key = api_key
+        self.model = model
+        self.base_url = base_url
+        self.timeout = timeout
+        self.cache_ttl = cache_ttl
+        self.cache = cache or QueryCache(max_entries=500, default_ttl=cache_ttl)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers + 2)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-profile")
+        self._inflight = {}
+        self._lock = threading.Lock()
+
+    def _post(self, messages, stream):
+        resp = self.session.post(
+            self.base_url,
+            headers={
+                "Authorization": f"Bearer {self.api_key}",
+                "HTTP-Referer": "https://your-app-name.streamlit.app",
+                "X-Title": "Talent Benchmark App",
+                "Content-Type": "application/json",
+            },
+            json={
+                "model": self.model,
+                "messages": messages,
+                "temperature": 0.5,
+                "max_tokens": 1200,
+                "stream": stream,
+            },
+            timeout=self.timeout,
+            stream=stream,
+        )
+        if not resp.ok:
+            resp.close()
+            raise ProfileGenerationError(resp.status_code)
+        return resp
+
+    def cached(self, prompt_data):
+        return self.cache.get(profile_key(prompt_data, self.model))
+
+    def generate(self, prompt_data):
+        """Full profile text (blocking); served from cache when possible."""
+        key = profile_key(prompt_data, self.model)
+        text = self.cache.get(key)
+        if text is None:
+            resp = self._post(build_messages(prompt_data), stream=False)
+            text = resp.json()["choices"][0]["message"]["content"]
+            self.cache.set(key, text, ttl=self.cache_ttl)
+        return text
+
+    def stream(self, prompt_data):
+        """Yield the profile in chunks as the model produces them.
+
+        Cached (or already pre-generating) profiles are yielded in one piece;
+        a streamed profile is cached only once the server sends ``[DONE]``. An
+        error event, or a stream that ends early, raises
+        ``ProfileGenerationError`` and caches nothing.
+        """
+        key = profile_key(prompt_data, self.model)
+        text = self.cache.get(key)
+        if text is None:
+            with self._lock:
+                future = self._inflight.get(key)
+            if future is not None:
+                text = future.result()
+        if text is not None:
+            yield text
+            return
+
+        parts, completed = [], False
+        with self._post(build_messages(prompt_data), stream=True) as resp:
+            # text/event-stream is UTF-8 by spec; without a charset in the
+            # Content-Type, requests would decode it as ISO-8859-1
+            resp.encoding = "utf-8"
+            for line in resp.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue  # blank separators and ": keep-alive" comments
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    completed = True
+                    break
+                event = json.loads(data)
+                if event.get("error"):
+                    # mid-stream failure: the HTTP status was already 200
+                    error = event["error"]
+                    raise ProfileGenerationError(error.get("code", "stream"), error.get("message", ""))
+                choices = event.get("choices") or [{}]
+                chunk = (choices[0].get("delta") or {}).get("content")
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        if not completed:
+            raise ProfileGenerationError("stream", "connection closed before the profile was complete")
+        self.cache.set(key, "".join(parts), ttl=self.cache_ttl)
+
+    def prefetch(self, prompt_data_list):
+        """Start background generation for profiles not cached or in flight."""
+        futures = []
+        for prompt_data in prompt_data_list:
+            key = profile_key(prompt_data, self.model)
+            if self.cache.get(key) is not None:
+                continue
+            with self._lock:
+                if key in self._inflight:
+                    continue
+                future = self._pool.submit(self.generate, prompt_data)
+                self._inflight[key] = future
+            future.add_done_callback(lambda _f, k=key: self._forget(k))
+            futures.append(future)
+        return futures
+
+    def _forget(self, key):
+        with self._lock:
+            self._inflight.pop(key, None)
+
+    def pending(self):
+        with self._lock:
+            return len(self._inflight)
@@ -0,0 +1,106 @@
+"""Process-wide cache for dashboard reads.
+
+Streamlit re-executes the whole script on every widget interaction, so every
+unguarded read hits Postgres again. ``QueryCache`` keeps loaded results with a
+per-entry TTL, evicts the least recently used entry once ``max_entries`` is
+reached, and drops every entry carrying a tag when ``invalidate(tag)`` is
+called (e.g. ``"benchmarks"`` after a new talent_benchmarks row).
+
+Cached values are shared between sessions: treat them as read-only.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+from sqlalchemy import text
+
+
+class QueryCache:
+    def __init__(self, max_entries=256, default_ttl=300.0, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._clock = clock
+        self._entries = OrderedDict()  # key -> (expires_at, tags, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_or_load(self, key, loader, ttl=None, tags=()):
+        """Return the cached value for ``key`` or call ``loader()`` and store it.
+
+        Exceptions from ``loader`` propagate and nothing is cached.
+        """
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        value = loader()
+        self.set(key, value, ttl=ttl, tags=tags)
+        return value
+
+    def get(self, key, default=None):
+        """Cached value for ``key`` (counted as a hit/miss), or ``default``."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > self._clock():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, frozenset(tags), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def values(self):
+        """Live (unexpired) cached values, e.g. to total their memory."""
+        now = self._clock()
+        with self._lock:
+            return [value for expires_at, _, value in self._entries.values() if expires_at > now]
+
+    def invalidate(self, tag=None):
+        """Drop entries carrying ``tag`` (everything when ``tag`` is None)."""
+        with self._lock:
+            if tag is None:
+                dropped = len(self._entries)
+                self._entries.clear()
+                return dropped
+            stale = [k for k, (_, tags, _) in self._entries.items() if tag in tags]
+            for k in stale:
+                del self._entries[k]
+            return len(stale)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            }
+
+
+def cached_read_sql(cache: QueryCache, engine, sql: str, params=None, ttl=None, tags=()):
+    """``pd.read_sql`` through the cache, keyed by statement and parameters."""
+    key = ("sql", sql, tuple(sorted((params or {}).items())))
+
+    def load():
+        with engine.connect() as con:
+            return pd.read_sql(text(sql), con, params=params)
+
+    return cache.get_or_load(key, load, ttl=ttl, tags=tags)
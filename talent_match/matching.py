@@ -0,0 +1,382 @@
+"""In-process matching engine.
+
+Mirrors the CTE chain of ``v_benchmark_matching`` (tv_all -> baseline ->
+tv_match -> tgv_match -> final_match) with NumPy, so scoring one benchmark no
+longer makes Postgres evaluate the view for every saved benchmark.
+
+The TV scores of the whole workforce are loaded once into a dense
+employees x TV matrix (``TVMatrix``); every benchmark is then a handful of
+array operations over that matrix.
+"""
+import os
+import sys
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from talent_match.weights import TGV_WEIGHTS, parse_weights  # noqa: F401 (re-export)
+
+RESULT_COLUMNS = [
+    "employee_id", "fullname", "directorate", "role", "grade",
+    "tgv_name", "tv_name", "baseline_score", "user_score",
+    "tv_match_rate", "tgv_match_rate", "final_match_rate",
+]
+
+# Employee-level columns of a top_candidates page (TGV columns follow)
+CANDIDATE_COLUMNS = ["employee_id", "fullname", "directorate", "role", "grade", "final_match_rate"]
+
+# latest performance year per employee: the view's GROUP BY, or the lookup
+# table maintained by "6.Documentation SQL Indexes.sql" when it exists
+LATEST_YEAR_GROUP_BY_SQL = """
+  SELECT employee_id, MAX(year) AS latest_year
+  FROM performance_yearly
+  GROUP BY 1
+"""
+LATEST_YEAR_LOOKUP_SQL = """
+  SELECT employee_id, latest_year
+  FROM employee_latest_year
+"""
+LATEST_YEAR_AVAILABLE_SQL = "SELECT to_regclass('employee_latest_year') IS NOT NULL"
+
+# tv_all exactly as in v_benchmark_matching (one row per employee x TV)
+TV_ALL_TEMPLATE = """
+WITH latest AS ({latest})
+SELECT c.employee_id, 'Competencies' AS tgv_name, p.pillar_label AS tv_name,
+       c.score::float8 AS user_score, 'higher' AS direction
+FROM competencies_yearly c
+JOIN dim_competency_pillars p ON p.pillar_code = c.pillar_code
+JOIN latest ly ON ly.employee_id = c.employee_id AND ly.latest_year = c.year
+UNION ALL
+SELECT pr.employee_id, 'Cognitive', 'IQ', pr.iq::float8, 'higher' FROM profiles_psych pr
+UNION ALL
+SELECT pr.employee_id, 'Cognitive', 'GTQ', pr.gtq::float8, 'higher' FROM profiles_psych pr
+UNION ALL
+SELECT pr.employee_id, 'Cognitive', 'TIKI', pr.tiki::float8, 'higher' FROM profiles_psych pr
+UNION ALL
+SELECT ps.employee_id, 'PersonalityPAPI', ps.scale_code, ps.score::float8, 'higher'
+FROM papi_scores ps
+UNION ALL
+SELECT y.employee_id, 'Context', 'PerformanceRating', y.rating::float8, 'higher'
+FROM performance_yearly y
+JOIN latest ly ON ly.employee_id = y.employee_id AND ly.latest_year = y.year
+UNION ALL
+SELECT s.employee_id, 'BehaviorStrengths', 'StrengthsRankAvg', AVG(s.rank)::float8, 'lower'
+FROM strengths s
+GROUP BY s.employee_id
+"""
+TV_ALL_SQL = TV_ALL_TEMPLATE.format(latest=LATEST_YEAR_GROUP_BY_SQL)
+TV_ALL_LOOKUP_SQL = TV_ALL_TEMPLATE.format(latest=LATEST_YEAR_LOOKUP_SQL)
+
+EMPLOYEE_META_SQL = """
+SELECT
+  e.employee_id,
+  e.fullname,
+  dir.name AS directorate,
+  pos.name AS role,
+  grd.name AS grade
+FROM employees e
+LEFT JOIN dim_directorates dir ON dir.directorate_id = e.directorate_id
+LEFT JOIN dim_positions    pos ON pos.position_id    = e.position_id
+LEFT JOIN dim_grades       grd ON grd.grade_id       = e.grade_id
+"""
+
+# The original round-trip: Postgres evaluates the whole view, then filters
+VIEW_RANK_SQL = """
+SELECT
+  v.employee_id,
+  e.fullname,
+  dir.name  AS directorate,
+  pos.name  AS role,
+  grd.name  AS grade,
+  v.tgv_name,
+  v.tv_name,
+  v.baseline_score,
+  v.user_score,
+  v.tv_match_rate,
+  v.tgv_match_rate,
+  v.final_match_rate
+FROM v_benchmark_matching v
+LEFT JOIN employees         e   ON e.employee_id      = v.employee_id
+LEFT JOIN dim_directorates  dir ON dir.directorate_id = e.directorate_id
+LEFT JOIN dim_positions     pos ON pos.position_id    = e.position_id
+LEFT JOIN dim_grades        grd ON grd.grade_id       = e.grade_id
+WHERE v.job_vacancy_id = :bench_id
+ORDER BY v.final_match_rate DESC, v.employee_id
+"""
+
+BENCHMARK_SQL = """
+SELECT selected_talent_ids, weights_config
+FROM talent_benchmarks
+WHERE job_vacancy_id = :bench_id
+"""
+
+
+@dataclass
+class TVMatrix:
+    """Dense employees x TV score matrix plus the lookups needed to score it."""
+    employee_ids: np.ndarray   # (n_emp,) object
+    tv_names: np.ndarray       # (n_tv,) object
+    tgv_names: np.ndarray      # (n_tv,) object, TGV of each TV column
+    lower_better: np.ndarray   # (n_tv,) bool, direction = 'lower'
+    scores: np.ndarray         # (n_emp, n_tv) float64, NaN = NULL score
+    present: np.ndarray        # (n_emp, n_tv) bool, employee has a tv_all row
+    in_employees: np.ndarray   # (n_emp,) bool, employee exists in `employees`
+    meta: pd.DataFrame         # fullname/directorate/role/grade, aligned with rows
+    row_index: dict            # employee_id -> row number
+    # identifies this load in cache keys (an id() can be reused once the matrix is freed)
+    token: str = field(default_factory=lambda: os.urandom(8).hex())
+
+    @property
+    def tgv_list(self):
+        return list(dict.fromkeys(self.tgv_names.tolist()))
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the matrix (arrays, ids, metadata, lookup)."""
+        return int(
+            self.scores.nbytes + self.present.nbytes + self.in_employees.nbytes + self.lower_better.nbytes
+            + pd.Index(self.employee_ids).memory_usage(deep=True)
+            + self.meta.memory_usage(deep=True).sum()
+            + sys.getsizeof(self.row_index)
+        )
+
+    def rows_for(self, employee_ids):
+        # Unknown ids are skipped; repeated ids are kept so they weigh twice in
+        # the median exactly like UNNEST(selected_talent_ids) does.
+        return np.array(
+            [self.row_index[e] for e in employee_ids if e in self.row_index],
+            dtype=np.int64,
+        )
+
+
+@dataclass
+class MatchResult:
+    """Scores of every employee against one benchmark."""
+    baseline: np.ndarray        # (n_tv,) float64, NaN = NULL baseline
+    has_baseline: np.ndarray    # (n_tv,) bool, a baseline row exists for the TV
+    tv_match_rate: np.ndarray   # (n_emp, n_tv)
+    tgv_match_rate: np.ndarray  # (n_emp, n_tgv)
+    final_match_rate: np.ndarray  # (n_emp,), rounded to 2 decimals
+    tgv_list: list
+
+
+def round_half_up(values, decimals=2):
+    """Postgres ROUND(numeric, n): halves go away from zero (NumPy rounds to even)."""
+    scale = 10.0 ** decimals
+    values = np.asarray(values, dtype=np.float64)
+    return np.sign(values) * np.floor(np.abs(values) * scale + 0.5 + 1e-9) / scale
+
+
+def build_tv_matrix(tv_long: pd.DataFrame, employees: pd.DataFrame) -> TVMatrix:
+    """Pivot tv_all rows (employee_id, tgv_name, tv_name, user_score, direction)."""
+    tv_long = tv_long.drop_duplicates(["employee_id", "tgv_name", "tv_name"], keep="last")
+    employees = employees.drop_duplicates("employee_id").set_index("employee_id")
+
+    emp_codes, employee_ids = pd.factorize(tv_long["employee_id"], sort=True)
+    tv_keys = tv_long["tgv_name"].astype(str) + "\x1f" + tv_long["tv_name"].astype(str)
+    tv_codes, tv_uniques = pd.factorize(tv_keys, sort=True)
+    tv_parts = np.array([k.split("\x1f", 1) for k in tv_uniques], dtype=object).reshape(-1, 2)
+
+    n_emp, n_tv = len(employee_ids), len(tv_uniques)
+    scores = np.full((n_emp, n_tv), np.nan)
+    present = np.zeros((n_emp, n_tv), dtype=bool)
+    scores[emp_codes, tv_codes] = pd.to_numeric(tv_long["user_score"], errors="coerce").to_numpy(dtype=np.float64)
+    present[emp_codes, tv_codes] = True
+
+    lower_better = np.zeros(n_tv, dtype=bool)
+    lower_better[tv_codes] = (tv_long["direction"] == "lower").to_numpy()
+
+    employee_ids = np.asarray(employee_ids, dtype=object)
+    meta = employees.reindex(employee_ids)[["fullname", "directorate", "role", "grade"]]
+    # a handful of distinct directorates/roles/grades repeated on every row
+    meta = meta.astype({"directorate": "category", "role": "category", "grade": "category"})
+    return TVMatrix(
+        employee_ids=employee_ids,
+        tv_names=tv_parts[:, 1],
+        tgv_names=tv_parts[:, 0],
+        lower_better=lower_better,
+        scores=scores,
+        present=present,
+        in_employees=pd.Index(employee_ids).isin(employees.index),  # hashed; np.isin on objects is O(n*m)
+        meta=meta.reset_index(drop=True),
+        row_index={e: i for i, e in enumerate(employee_ids)},
+    )
+
+
+def tv_all_sql(con) -> str:
+    """tv_all through the latest-year lookup table when it is installed."""
+    if con.execute(text(LATEST_YEAR_AVAILABLE_SQL)).scalar():
+        return TV_ALL_LOOKUP_SQL
+    return TV_ALL_SQL
+
+
+def load_tv_matrix(engine) -> TVMatrix:
+    """Two queries, regardless of how many benchmarks will be scored."""
+    with engine.connect() as con:
+        tv_long = pd.read_sql(text(tv_all_sql(con)), con)
+        employees = pd.read_sql(text(EMPLOYEE_META_SQL), con)
+    return build_tv_matrix(tv_long, employees)
+
+
+def fetch_benchmark(engine, bench_id: int):
+    """``(selected_talent_ids, weights_config)`` of one benchmark."""
+    with engine.connect() as con:
+        row = con.execute(text(BENCHMARK_SQL), {"bench_id": bench_id}).first()
+    if row is None:
+        return [], {}
+    return list(row[0] or []), row[1] or {}
+
+
+def fetch_benchmark_ids(engine, bench_id: int):
+    return fetch_benchmark(engine, bench_id)[0]
+
+
+def compute_baseline(matrix: TVMatrix, bench_employee_ids):
+    """PERCENTILE_DISC(0.5) of the benchmark employees' scores, per TV."""
+    rows = matrix.rows_for(bench_employee_ids)
+    bench = matrix.scores[rows]
+    has_baseline = matrix.present[rows].any(axis=0)
+
+    # NaN sorts last, so the first `counts` entries of each column are the
+    # non-NULL scores; PERCENTILE_DISC(0.5) picks the ceil(n/2)-th of them.
+    ordered = np.sort(bench, axis=0)
+    counts = (~np.isnan(bench)).sum(axis=0)
+    pick = np.maximum(np.ceil(counts * 0.5).astype(np.int64) - 1, 0)
+    baseline = np.full(matrix.scores.shape[1], np.nan)
+    valid = counts > 0
+    if valid.any():
+        baseline[valid] = ordered[pick[valid], np.flatnonzero(valid)]
+    return baseline, has_baseline
+
+
+def tv_match_rates(matrix: TVMatrix, baseline, has_baseline, rows=slice(None)):
+    """Direction-aware TV match rates of ``rows`` (all employees by default)."""
+    scores = matrix.scores[rows]
+    usable = ~np.isnan(baseline) & (baseline != 0)
+    safe_base = np.where(usable, baseline, 1.0)
+    with np.errstate(invalid="ignore"):
+        higher = np.minimum(100.0 * scores / safe_base, 100.0)
+        lower = np.clip(100.0 * (2 * safe_base - scores) / safe_base, 0.0, 100.0)
+    tv_rate = np.where(matrix.lower_better, lower, higher)
+    # LEAST/GREATEST ignore NULLs in Postgres, so a NULL user score against a
+    # real baseline comes out of the view as 100.
+    tv_rate = np.where(np.isnan(scores), 100.0, tv_rate)
+    tv_rate = np.where(usable, tv_rate, np.nan)
+    # Only TVs that have a baseline row for this benchmark exist in tv_match
+    tv_rate[~(matrix.present[rows] & has_baseline)] = np.nan
+    return tv_rate
+
+
+def score_benchmark(matrix: TVMatrix, bench_employee_ids, weights_config=None, baseline=None) -> MatchResult:
+    """Direction-aware TV match, TGV averages and weighted final score.
+
+    ``weights_config`` is the benchmark's weights_config (see weights.py);
+    empty means the view's fixed 0.40/0.30/0.15/0.10/0.05 and plain averages.
+    ``baseline`` is a stored ``(baseline, has_baseline)`` pair (see
+    baselines.load_baseline); computed from the benchmark employees when None.
+    """
+    tgv_weights, tv_weights = parse_weights(weights_config)
+    baseline, has_baseline = baseline if baseline is not None else compute_baseline(matrix, bench_employee_ids)
+    scores = matrix.scores
+    tv_rate = tv_match_rates(matrix, baseline, has_baseline)
+
+    tgv_list = matrix.tgv_list
+    tv_w = np.array([tv_weights.get(name, 1.0) for name in matrix.tv_names], dtype=np.float64)
+    tgv_rate = np.full((scores.shape[0], len(tgv_list)), np.nan)
+    final = np.zeros(scores.shape[0])
+    for g, tgv in enumerate(tgv_list):
+        cols = matrix.tgv_names == tgv
+        block = tv_rate[:, cols]
+        valid = ~np.isnan(block)
+        w = np.where(valid, tv_w[cols], 0.0)
+        sums = (np.nan_to_num(block, nan=0.0) * w).sum(axis=1)
+        wsum = w.sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            tgv_rate[:, g] = np.where(valid.any(axis=1) & (wsum > 0), sums / wsum, np.nan)
+        final += tgv_weights.get(tgv, 0.0) * np.nan_to_num(tgv_rate[:, g], nan=0.0)
+
+    return MatchResult(
+        baseline=baseline,
+        has_baseline=has_baseline,
+        tv_match_rate=tv_rate,
+        tgv_match_rate=tgv_rate,
+        final_match_rate=round_half_up(final),
+        tgv_list=tgv_list,
+    )
+
+
+def result_frame(matrix: TVMatrix, result: MatchResult, limit=None, employee_ids=None) -> pd.DataFrame:
+    """Long employee x TV rows in the same shape/order as run_matching's query.
+
+    ``employee_ids`` restricts the output to those employees (incremental refresh).
+    """
+    keep = matrix.in_employees
+    if employee_ids is not None:
+        keep = keep & np.isin(matrix.employee_ids, np.asarray(list(employee_ids), dtype=object))
+    rows, cols = np.nonzero(matrix.present & result.has_baseline & keep[:, None])
+    final = result.final_match_rate[rows]
+    emp = matrix.employee_ids[rows]
+    # ORDER BY final_match_rate DESC, employee_id (then TGV/TV for stability)
+    order = np.lexsort((matrix.tv_names[cols], matrix.tgv_names[cols], emp, -final))
+    if limit is not None:
+        order = order[:limit]
+    rows, cols = rows[order], cols[order]
+
+    tgv_pos = {t: g for g, t in enumerate(result.tgv_list)}
+    tgv_idx = np.array([tgv_pos[t] for t in matrix.tgv_names], dtype=np.int64)
+
+    out = matrix.meta.iloc[rows].reset_index(drop=True)
+    out.insert(0, "employee_id", matrix.employee_ids[rows])
+    out["tgv_name"] = matrix.tgv_names[cols]
+    out["tv_name"] = matrix.tv_names[cols]
+    out["baseline_score"] = round_half_up(result.baseline[cols])
+    out["user_score"] = round_half_up(matrix.scores[rows, cols])
+    out["tv_match_rate"] = round_half_up(result.tv_match_rate[rows, cols])
+    out["tgv_match_rate"] = round_half_up(result.tgv_match_rate[rows, tgv_idx[cols]])
+    out["final_match_rate"] = result.final_match_rate[rows]
+    return out[RESULT_COLUMNS]
+
+
+def top_candidates(matrix: TVMatrix, result: MatchResult, k=100, after=None) -> pd.DataFrame:
+    """One row per employee (final rate + one column per TGV), best first.
+
+    ``after`` is the keyset cursor ``(final_match_rate, employee_id)`` of the
+    previous page's last row; see ``page_cursor``.
+    """
+    scored = matrix.in_employees & (matrix.present & result.has_baseline).any(axis=1)
+    rows = np.flatnonzero(scored)
+    final = result.final_match_rate[rows]
+    emp = matrix.employee_ids[rows]
+    if after is not None:
+        last_rate, last_id = after
+        keep = (final < last_rate) | ((final == last_rate) & (emp > last_id))
+        rows, final, emp = rows[keep], final[keep], emp[keep]
+    rows = rows[np.lexsort((emp, -final))[:k]]
+
+    out = matrix.meta.iloc[rows].reset_index(drop=True)
+    out.insert(0, "employee_id", matrix.employee_ids[rows])
+    out["final_match_rate"] = result.final_match_rate[rows]
+    tgv_rates = round_half_up(result.tgv_match_rate[rows])
+    for g, tgv in enumerate(result.tgv_list):
+        out[tgv] = tgv_rates[:, g]
+    return out
+
+
+def candidate_detail(matrix: TVMatrix, result: MatchResult, employee_id) -> pd.DataFrame:
+    """TV rows of a single candidate, ordered by TGV/TV."""
+    detail = result_frame(matrix, result, employee_ids=[employee_id])
+    return detail.sort_values(["tgv_name", "tv_name"], ignore_index=True)
+
+
+def page_cursor(page: pd.DataFrame, k: int):
+    """Keyset cursor for the page after ``page``; None when it was the last one."""
+    if len(page) < k:
+        return None
+    last = page.iloc[-1]
+    return float(last["final_match_rate"]), last["employee_id"]
+
+
+def match_benchmark(matrix: TVMatrix, bench_employee_ids, weights_config=None, limit=None) -> pd.DataFrame:
+    return result_frame(matrix, score_benchmark(matrix, bench_employee_ids, weights_config), limit=limit)
@@ -0,0 +1,282 @@
+"""Per-rerun stage timings for app.py, aggregated into histograms.
+
+Every section of the app runs inside ``perf.stage(name)``; the stage records
+its wall time and, via ``record(value)``, the rows and bytes it returned
+(DataFrames are measured with ``memory_usage(deep=True)``, bytes/str by
+length). At the end of the script ``perf.finish()`` folds the rerun into the
+process-wide ``PerfRegistry``:
+
+* Prometheus histograms / counters per stage (``prometheus_text``), written
+  every ``prom_interval_s`` to ``prom_path`` for node_exporter's textfile
+  collector (secret ``PERF_PROM_PATH``)
+* one JSON line per rerun appended to ``jsonl_path`` (secret ``PERF_LOG_PATH``)
+* recent samples per stage for the admin panel (``summary``)
+
+Usage (summarize a JSONL log):
+    python -m talent_match.perf --log perf.jsonl
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+
+import numpy as np
+import pandas as pd
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SUMMARY_COLUMNS = ["stage", "count", "p50_ms", "p95_ms", "max_ms", "rows", "bytes", "errors"]
+
+
+def payload_size(value):
+    """``(rows, nbytes)`` of a stage result; None when not measurable."""
+    if value is None:
+        return None, None
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return len(value), int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, (bytes, bytearray)):
+        return None, len(value)
+    if isinstance(value, str):
+        return None, len(value.encode("utf-8"))
+    if isinstance(value, (list, tuple, dict, set)):
+        return len(value), None
+    return None, None
+
+
+@dataclass
+class StageTiming:
+    name: str
+    seconds: float = 0.0
+    rows: int = None
+    nbytes: int = None
+    error: str = None
+
+    def record(self, value=None, rows=None, nbytes=None):
+        """Rows/bytes of ``value``; explicit ``rows`` / ``nbytes`` win."""
+        value_rows, value_bytes = payload_size(value)
+        self.rows = rows if rows is not None else value_rows
+        self.nbytes = nbytes if nbytes is not None else value_bytes
+        return value
+
+
+class RerunProfile:
+    """Stages of one script run, in execution order."""
+
+    def __init__(self, registry=None, session=None):
+        self.registry = registry
+        self.session = session
+        self.started = time.perf_counter()
+        self.started_at = time.time()
+        self.stages = []
+        self.total_s = None
+
+    @contextmanager
+    def stage(self, name):
+        timing = StageTiming(name)
+        start = time.perf_counter()
+        try:
+            yield timing
+        except Exception as e:  # Streamlit's rerun/stop are BaseExceptions: not errors
+            timing.error = type(e).__name__
+            raise
+        finally:
+            timing.seconds = time.perf_counter() - start
+            self.stages.append(timing)
+
+    def call(self, name, fn, *args, **kwargs):
+        """``fn(*args, **kwargs)`` as one stage, measuring what it returns."""
+        with self.stage(name) as s:
+            return s.record(fn(*args, **kwargs))
+
+    def finish(self) -> dict:
+        self.total_s = time.perf_counter() - self.started
+        if self.registry is not None:
+            self.registry.observe(self)
+        return self.to_dict()
+
+    def to_dict(self) -> dict:
+        return {
+            "ts": round(self.started_at, 3),
+            "session": self.session,
+            "total_s": round(self.total_s if self.total_s is not None else time.perf_counter() - self.started, 6),
+            "stages": [{**asdict(s), "seconds": round(s.seconds, 6)} for s in self.stages],
+        }
+
+    def frame(self) -> pd.DataFrame:
+        """This rerun's breakdown for the admin panel."""
+        out = pd.DataFrame([asdict(s) for s in self.stages], columns=["name", "seconds", "rows", "nbytes", "error"])
+        out["ms"] = (out.pop("seconds") * 1000).round(2)
+        total = max(time.perf_counter() - self.started if self.total_s is None else self.total_s, 1e-9)
+        out["share"] = (out["ms"] / (total * 1000)).round(3)
+        return out.rename(columns={"name": "stage", "nbytes": "bytes"})[
+            ["stage", "ms", "share", "rows", "bytes", "error"]
+        ]
+
+
+class _Histogram:
+    def __init__(self, max_samples):
+        self.buckets = np.zeros(len(LATENCY_BUCKETS), dtype=np.int64)
+        self.sum = 0.0
+        self.count = 0
+        self.rows = 0
+        self.nbytes = 0
+        self.errors = 0
+        self.samples = deque(maxlen=max_samples)
+
+    def add(self, seconds, rows=None, nbytes=None, error=None):
+        self.buckets[np.searchsorted(LATENCY_BUCKETS, seconds):] += 1
+        self.sum += seconds
+        self.count += 1
+        self.rows += rows or 0
+        self.nbytes += nbytes or 0
+        self.errors += error is not None
+        self.samples.append(seconds)
+
+
+class PerfRegistry:
+    """Process-wide aggregation of rerun profiles (thread-safe)."""
+
+    def __init__(self, jsonl_path=None, prom_path=None, prom_interval_s=15.0, max_samples=512, collectors=()):
+        self.jsonl_path = jsonl_path
+        self.prom_path = prom_path
+        self.prom_interval_s = prom_interval_s
+        self.collectors = list(collectors)  # callables returning extra Prometheus lines
+        self._max_samples = max_samples
+        self._lock = threading.Lock()
+        self._stages = defaultdict(lambda: _Histogram(self._max_samples))
+        self._reruns = _Histogram(max_samples)
+        self._prom_written = 0.0
+
+    def start_rerun(self, session=None) -> RerunProfile:
+        return RerunProfile(self, session or uuid.uuid4().hex[:8])
+
+    def observe(self, profile: RerunProfile):
+        with self._lock:
+            for s in profile.stages:
+                self._stages[s.name].add(s.seconds, s.rows, s.nbytes, s.error)
+            self._reruns.add(profile.total_s)
+            if self.jsonl_path:
+                with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps(profile.to_dict(), default=str) + "\n")
+            write_prom = self.prom_path and time.monotonic() - self._prom_written >= self.prom_interval_s
+            if write_prom:
+                self._prom_written = time.monotonic()
+        if write_prom:
+            self.write_prometheus(self.prom_path)
+
+    def summary(self) -> pd.DataFrame:
+        """Per-stage p50/p95 over the recent samples, slowest p95 first."""
+        with self._lock:
+            rows = []
+            for name, h in self._stages.items():
+                ms = np.asarray(h.samples) * 1000
+                rows.append({
+                    "stage": name, "count": h.count,
+                    "p50_ms": round(float(np.percentile(ms, 50)), 2),
+                    "p95_ms": round(float(np.percentile(ms, 95)), 2),
+                    "max_ms": round(float(ms.max()), 2),
+                    "rows": h.rows, "bytes": h.nbytes, "errors": h.errors,
+                })
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS).sort_values("p95_ms", ascending=False, ignore_index=True)
+
+    # ----------------------------
+    # Prometheus text exposition
+    # ----------------------------
+    @staticmethod
+    def _histogram_lines(metric, h: _Histogram, labels=""):
+        sep = "," if labels else ""
+        tags = f"{{{labels}}}" if labels else ""
+        lines = [f'{metric}_bucket{{{labels}{sep}le="{le:g}"}} {n}' for le, n in zip(LATENCY_BUCKETS, h.buckets)]
+        lines += [
+            f'{metric}_bucket{{{labels}{sep}le="+Inf"}} {h.count}',
+            f"{metric}_sum{tags} {h.sum:.6f}",
+            f"{metric}_count{tags} {h.count}",
+        ]
+        return lines
+
+    def prometheus_text(self) -> str:
+        with self._lock:
+            stages = sorted(self._stages.items())
+            lines = [
+                "# HELP talent_match_rerun_seconds Wall time of one app.py script run.",
+                "# TYPE talent_match_rerun_seconds histogram",
+                *self._histogram_lines("talent_match_rerun_seconds", self._reruns),
+                "# HELP talent_match_stage_seconds Wall time of one app.py stage.",
+                "# TYPE talent_match_stage_seconds histogram",
+            ]
+            for name, h in stages:
+                lines += self._histogram_lines("talent_match_stage_seconds", h, f'stage="{name}"')
+            for metric, attr, help_text in (
+                ("talent_match_stage_rows_total", "rows", "Rows returned by a stage."),
+                ("talent_match_stage_bytes_total", "nbytes", "Bytes returned by a stage."),
+                ("talent_match_stage_errors_total", "errors", "Stage runs that raised."),
+            ):
+                lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+                lines += [f'{metric}{{stage="{name}"}} {getattr(h, attr)}' for name, h in stages]
+        for collect in self.collectors:
+            lines += list(collect())
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Atomic write (textfile collectors may read at any time)."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+
+def db_prometheus_lines(stats: dict):
+    """Prometheus lines for talent_match.db.Database.stats()."""
+    lines = ["# HELP talent_match_db_pool_checked_out Pooled connections in use.",
+             "# TYPE talent_match_db_pool_checked_out gauge"]
+    lines += [f'talent_match_db_pool_checked_out{{route="{r}"}} {p["checked_out"]}'
+              for r, p in stats["pools"].items()]
+    lines += ["# HELP talent_match_db_pool_wait_p95_ms Recent p95 pool checkout wait.",
+              "# TYPE talent_match_db_pool_wait_p95_ms gauge"]
+    lines += [f'talent_match_db_pool_wait_p95_ms{{route="{r}"}} {w["p95_ms"]}'
+              for r, w in stats["pool_wait"].items() if w["p95_ms"] is not None]
+    for metric, key in (("talent_match_db_queries_total", "total"),
+                        ("talent_match_db_query_errors_total", "errors"),
+                        ("talent_match_db_query_timeouts_total", "timeouts")):
+        lines += [f"# TYPE {metric} counter"]
+        lines += [f'{metric}{{route="{q["route"]}",label="{q["label"]}"}} {q[key]}' for q in stats["queries"]]
+    return lines
+
+
+def summarize_log(path) -> pd.DataFrame:
+    """Per-stage percentiles over a JSONL log written by PerfRegistry."""
+    with open(path, encoding="utf-8") as f:
+        reruns = [json.loads(line) for line in f if line.strip()]
+    stages = pd.DataFrame([s for r in reruns for s in r["stages"]] +
+                          [{"name": "rerun_total", "seconds": r["total_s"]} for r in reruns])
+    if stages.empty:
+        return pd.DataFrame(columns=SUMMARY_COLUMNS)
+    stages = stages.reindex(columns=["name", "seconds", "rows", "nbytes", "error"])
+    stages["ms"] = stages["seconds"] * 1000
+    grouped = stages.groupby("name")
+    return pd.DataFrame({
+        "count": grouped.size(),
+        "p50_ms": grouped["ms"].quantile(0.5).round(2),
+        "p95_ms": grouped["ms"].quantile(0.95).round(2),
+        "max_ms": grouped["ms"].max().round(2),
+        "rows": grouped["rows"].sum().astype("int64"),
+        "bytes": grouped["nbytes"].sum().astype("int64"),
+        "errors": grouped["error"].count(),
+    }).rename_axis("stage").reset_index().sort_values("p95_ms", ascending=False, ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize a PERF_LOG_PATH JSONL log")
+    parser.add_argument("--log", required=True)
+    args = parser.parse_args(argv)
+    print(summarize_log(args.log).to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
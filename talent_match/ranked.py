@@ -0,0 +1,154 @@
+"""Compact employee-level rankings shared by every session.
+
+A ranked benchmark used to live in each session as a wide DataFrame:
+fullname/directorate/role/grade strings repeated on every page row, and a
+per-session dict of candidate detail frames. ``RankedBenchmark`` keeps the
+ranking as a few arrays over the rows of the shared ``TVMatrix``:
+
+* ``rows``: int32 matrix rows in rank order; the matrix ``meta`` is the
+  employee dimension, with categorical directorate/role/grade
+* ``final`` / ``tgv_rates``: float32, already rounded to 2 decimals
+* ``tgv_codes``: int8 TGV code of every TV column
+
+Pages (``head``), candidate detail (``detail``) and export slices
+(``long_frame``) are built on demand. All arrays are read-only, so one
+instance can be handed to every session that opens the same benchmark (see
+``ranking_key``). ``nbytes`` and ``state_nbytes`` make the per-benchmark and
+per-session memory measurable.
+"""
+import json
+import sys
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from talent_match.matching import (
+    RESULT_COLUMNS, TVMatrix, round_half_up, score_benchmark, tv_match_rates,
+)
+
+
+def _frozen(values, dtype):
+    values = np.ascontiguousarray(values, dtype=dtype)
+    values.flags.writeable = False
+    return values
+
+
+@dataclass(frozen=True)
+class RankedBenchmark:
+    bench_id: int
+    matrix: TVMatrix            # shared, not part of nbytes
+    rows: np.ndarray            # (n_ranked,) int32, best first
+    final: np.ndarray           # (n_ranked,) float32
+    tgv_rates: np.ndarray       # (n_ranked, n_tgv) float32, NaN = no rate
+    tgv_list: tuple             # TGV names, in tgv_rates column order
+    tgv_codes: np.ndarray       # (n_tv,) int8, TGV of each TV column
+    baseline: np.ndarray        # (n_tv,) float64, NaN = NULL baseline
+    has_baseline: np.ndarray    # (n_tv,) bool
+
+    def __len__(self):
+        return len(self.rows)
+
+    @property
+    def nbytes(self):
+        return int(sum(a.nbytes for a in (self.rows, self.final, self.tgv_rates,
+                                          self.tgv_codes, self.baseline, self.has_baseline)))
+
+    def head(self, n) -> pd.DataFrame:
+        """The best ``n`` candidates, shaped like matching.top_candidates."""
+        rows = self.rows[:n]
+        out = self.matrix.meta.iloc[rows].reset_index(drop=True)
+        out.insert(0, "employee_id", self.matrix.employee_ids[rows])
+        out["final_match_rate"] = np.round(self.final[:n].astype(np.float64), 2)
+        rates = np.round(self.tgv_rates[:n].astype(np.float64), 2)
+        for g, tgv in enumerate(self.tgv_list):
+            out[tgv] = rates[:, g]
+        return out
+
+    def long_frame(self, start=0, stop=None) -> pd.DataFrame:
+        """Employee x TV rows of the candidates ranked ``start .. stop - 1``.
+
+        Same columns and order as matching.result_frame, so consecutive slices
+        concatenate to the full ranking.
+        """
+        matrix = self.matrix
+        ranks = np.arange(len(self.rows))[start:stop]
+        rows = self.rows[ranks].astype(np.int64)
+        # (TGV, TV) position of every TV column, for ordering inside an employee
+        tv_pos = np.empty(len(matrix.tv_names), dtype=np.int64)
+        tv_pos[np.lexsort((matrix.tv_names, matrix.tgv_names))] = np.arange(len(matrix.tv_names))
+        r, cols = np.nonzero(matrix.present[rows] & self.has_baseline)
+        order = np.lexsort((tv_pos[cols], r))
+        r, cols = r[order], cols[order]
+        tv_rate = tv_match_rates(matrix, self.baseline, self.has_baseline, rows=rows)
+
+        out = matrix.meta.iloc[rows[r]].reset_index(drop=True)
+        out.insert(0, "employee_id", matrix.employee_ids[rows[r]])
+        out["tgv_name"] = matrix.tgv_names[cols]
+        out["tv_name"] = matrix.tv_names[cols]
+        out["baseline_score"] = round_half_up(self.baseline[cols])
+        out["user_score"] = round_half_up(matrix.scores[rows[r], cols])
+        out["tv_match_rate"] = round_half_up(tv_rate[r, cols])
+        out["tgv_match_rate"] = np.round(self.tgv_rates[ranks[r], self.tgv_codes[cols]].astype(np.float64), 2)
+        out["final_match_rate"] = np.round(self.final[ranks[r]].astype(np.float64), 2)
+        return out[RESULT_COLUMNS]
+
+    def detail(self, employee_id) -> pd.DataFrame:
+        """TV rows of one candidate, as matching.candidate_detail returns them."""
+        row = self.matrix.row_index.get(employee_id)
+        rank = np.flatnonzero(self.rows == row) if row is not None else []
+        if len(rank) == 0:
+            return pd.DataFrame(columns=RESULT_COLUMNS)
+        return self.long_frame(rank[0], rank[0] + 1)
+
+
+def rank_benchmark(matrix: TVMatrix, bench_employee_ids, weights_config=None, bench_id=None) -> RankedBenchmark:
+    """Score one benchmark and keep only its compact employee-level ranking."""
+    result = score_benchmark(matrix, bench_employee_ids, weights_config)
+    scored = matrix.in_employees & (matrix.present & result.has_baseline).any(axis=1)
+    rows = np.flatnonzero(scored)
+    # ORDER BY final_match_rate DESC, employee_id (as top_candidates)
+    rows = rows[np.lexsort((matrix.employee_ids[rows], -result.final_match_rate[rows]))]
+    tgv_pos = {t: g for g, t in enumerate(result.tgv_list)}
+    return RankedBenchmark(
+        bench_id=bench_id,
+        matrix=matrix,
+        rows=_frozen(rows, np.int32),
+        final=_frozen(result.final_match_rate[rows], np.float32),
+        tgv_rates=_frozen(round_half_up(result.tgv_match_rate[rows]), np.float32),
+        tgv_list=tuple(result.tgv_list),
+        tgv_codes=_frozen([tgv_pos[t] for t in matrix.tgv_names], np.int8),
+        baseline=_frozen(result.baseline, np.float64),
+        has_baseline=_frozen(result.has_baseline, bool),
+    )
+
+
+def ranking_key(matrix: TVMatrix, bench_id: int, bench_employee_ids, weights_config=None):
+    """Cache key: sessions share a ranking only for the same matrix, ids and weights."""
+    return ("ranking", matrix.token, bench_id, tuple(bench_employee_ids),
+            json.dumps(weights_config or {}, sort_keys=True))
+
+
+def state_nbytes(value, _seen=None) -> int:
+    """Approximate bytes owned by a session-state value.
+
+    Shared objects (RankedBenchmark, TVMatrix) count as a reference only;
+    their memory is reported per benchmark / per process instead.
+    """
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(value, (RankedBenchmark, TVMatrix)):
+        return sys.getsizeof(value)
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        return int(np.sum(value.memory_usage(deep=True)))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(
+            state_nbytes(k, seen) + state_nbytes(v, seen) for k, v in value.items()
+        )
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sys.getsizeof(value) + sum(state_nbytes(v, seen) for v in value)
+    return sys.getsizeof(value)
@@ -0,0 +1,99 @@
+"""Benchmark weights (``talent_benchmarks.weights_config``).
+
+Shape, all keys optional::
+
+    {"tgv": {"Competencies": 0.4, "Cognitive": 0.3, ...},   # final score
+     "tv":  {"IQ": 2, "GTQ": 1, ...}}                        # within each TGV
+
+TGV weights not given fall back to ``TGV_WEIGHTS`` and are normalized to sum
+to 1, so sliders or partial configs never push a final score above 100. TV
+weights default to 1 (a plain average, as in v_benchmark_matching). Configs are
+validated by the same rules here (``parse_weights``) and in SQL
+(``fn_weights_config_valid``, which also backs a CHECK on talent_benchmarks).
+"""
+import json
+import math
+import numbers
+
+import numpy as np
+import pandas as pd
+
+# Same weights as the final_match CTE in v_benchmark_matching
+TGV_WEIGHTS = {
+    "Competencies": 0.40,
+    "Cognitive": 0.30,
+    "PersonalityPAPI": 0.15,
+    "Context": 0.10,
+    "BehaviorStrengths": 0.05,
+}
+
+
+def _weight(name, w):
+    # JSON numbers only, like the jsonb_typeof(...) = 'number' guards of
+    # fn_weights_config_valid / v_benchmark_matching
+    if isinstance(w, bool) or not isinstance(w, numbers.Real) or not math.isfinite(w):
+        raise ValueError(f"Weight of {name} must be a number, got {w!r}")
+    return float(w)
+
+
+def _section(cfg, key):
+    section = cfg.get(key)
+    section = {} if section is None else section
+    if not isinstance(section, dict):
+        raise ValueError(f"weights_config['{key}'] must be an object")
+    return section
+
+
+def parse_weights(weights_config=None):
+    """Return ``(tgv_weights, tv_weights)``; tgv weights sum to 1.
+
+    Raises ValueError for the configs ``fn_weights_config_valid`` (SQL doc 4)
+    rejects: unknown TGVs, non-numeric or negative weights, all TGVs at 0.
+    """
+    cfg = weights_config
+    if isinstance(cfg, str):
+        cfg = json.loads(cfg) if cfg.strip() else None
+    cfg = {} if cfg is None else cfg
+    if not isinstance(cfg, dict):
+        raise ValueError("weights_config must be an object")
+    tgv = dict(TGV_WEIGHTS)
+    given = {name: _weight(name, w) for name, w in _section(cfg, "tgv").items()}
+    unknown = set(given) - set(TGV_WEIGHTS)
+    if unknown:
+        raise ValueError(f"Unknown TGV in weights_config: {', '.join(sorted(unknown))}")
+    tgv.update(given)
+    if any(w < 0 for w in tgv.values()):
+        raise ValueError("TGV weights must be >= 0")
+    total = sum(tgv.values())
+    if total <= 0:
+        raise ValueError("At least one TGV weight must be > 0")
+    tgv = {name: w / total for name, w in tgv.items()}
+    tv = {name: _weight(name, w) for name, w in _section(cfg, "tv").items()}
+    if any(w < 0 for w in tv.values()):
+        raise ValueError("TV weights must be >= 0")
+    return tgv, tv
+
+
+def weights_config(tgv_weights=None, tv_weights=None):
+    """JSON-serializable weights_config for an INSERT into talent_benchmarks."""
+    cfg = {}
+    if tgv_weights:
+        cfg["tgv"] = {name: float(w) for name, w in tgv_weights.items()}
+    if tv_weights:
+        cfg["tv"] = {name: float(w) for name, w in tv_weights.items()}
+    return cfg
+
+
+def reweight(candidates: pd.DataFrame, tgv_weights) -> pd.Series:
+    """What-if final score from already-loaded per-candidate TGV rates.
+
+    ``candidates`` has one column per TGV (as returned by top_candidates);
+    missing TGV rates count as 0, exactly like COALESCE in the final score.
+    """
+    cols = [c for c in tgv_weights if c in candidates.columns]
+    w = np.array([tgv_weights[c] for c in cols], dtype=np.float64)
+    total = w.sum()
+    if total <= 0:
+        return pd.Series(0.0, index=candidates.index)
+    rates = np.nan_to_num(candidates[cols].to_numpy(dtype=np.float64), nan=0.0)
+    return pd.Series(rates @ (w / total), index=candidates.index)
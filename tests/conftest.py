@@ -0,0 +1,54 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# run from anywhere: the package lives at the repo root, next to this directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from talent_match import synth  # noqa: E402
+from talent_match.matching import build_tv_matrix  # noqa: E402
+
+N_EMPLOYEES = 400
+
+
+def tv_long_from_chunk(chunk):
+    """tv_all-shaped rows from synth.generate_chunk tables (latest year per employee)."""
+    comp = chunk["competencies_yearly"]
+    comp = comp[comp["year"] == comp.groupby("employee_id")["year"].transform("max")]
+    perf = chunk["performance_yearly"]
+    perf = perf[perf["year"] == perf.groupby("employee_id")["year"].transform("max")]
+    psych = chunk["profiles_psych"].melt("employee_id", ["iq", "gtq", "pauli", "faxtor", "tiki"],
+                                         var_name="tv_name", value_name="user_score")
+    strengths = chunk["strengths"].rename(columns={"theme": "tv_name", "rank": "user_score"})
+    parts = [
+        comp.assign(tgv_name="Competencies", tv_name=comp["pillar_code"], user_score=comp["score"], direction="higher"),
+        psych.assign(tgv_name="Cognitive", direction="higher"),
+        chunk["papi_scores"].assign(tgv_name="PersonalityPAPI", tv_name=lambda d: d["scale_code"],
+                                    user_score=lambda d: d["score"], direction="higher"),
+        perf.assign(tgv_name="Context", tv_name="rating", user_score=perf["rating"], direction="higher"),
+        strengths.assign(tgv_name="BehaviorStrengths", direction="lower"),
+    ]
+    cols = ["employee_id", "tgv_name", "tv_name", "user_score", "direction"]
+    return pd.concat([p[cols] for p in parts], ignore_index=True)
+
+
+@pytest.fixture(scope="session")
+def synth_data():
+    """``(tv_long, employees)`` of a synth chunk, shaped for build_tv_matrix."""
+    chunk = synth.generate_chunk(np.random.default_rng(7), 0, N_EMPLOYEES)
+    employees = chunk["employees"].assign(
+        directorate=lambda d: d["directorate_id"].astype(str),
+        role=lambda d: d["position_id"].astype(str),
+        grade=lambda d: d["grade_id"].astype(str),
+    )
+    return tv_long_from_chunk(chunk), employees
+
+
+@pytest.fixture(scope="session")
+def synth_matrix(synth_data):
+    tv_long, employees = synth_data
+    # a few employees only in tv_all: scored into baselines, never ranked
+    return build_tv_matrix(tv_long, employees.iloc[: N_EMPLOYEES - 5])
@@ -0,0 +1,143 @@
+"""ProfileGenerator against a local OpenAI-compatible SSE stub."""
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from talent_match.ai_profile import ProfileGenerationError, ProfileGenerator
+
+CHUNKS = ["## Job ", "Profile ", "Summary"]
+UTF8_CHUNKS = ["## The role’s ", "purpose • ", "Kepemimpinan — 5–6 ✓"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Chunks per candidate_id: ``error-*`` sends an error event mid-stream,
+    ``cut-*`` drops the connection before ``[DONE]``, ``slow-*`` waits first,
+    ``utf8-*`` streams raw (unescaped) non-ASCII text under a charset-less Content-Type."""
+
+    calls = Counter()
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        data = json.loads(body["messages"][1]["content"].split("Data:\n", 1)[1])
+        candidate = data["candidate_id"]
+        StubHandler.calls[candidate] += 1
+        if candidate.startswith("slow-"):
+            time.sleep(0.3)
+        if not body["stream"]:
+            payload = json.dumps({"choices": [{"message": {"content": "".join(CHUNKS)}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.event(": keep-alive")
+        if candidate.startswith("utf8-"):
+            for chunk in UTF8_CHUNKS:
+                self.event("data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}, ensure_ascii=False))
+            self.event("data: [DONE]")
+            return
+        self.event("data: " + json.dumps({"choices": [{"delta": {"content": CHUNKS[0]}}]}))
+        if candidate.startswith("error-"):
+            self.event("data: " + json.dumps({"error": {"code": 502, "message": "upstream failed"}}))
+            return
+        if candidate.startswith("cut-"):
+            return  # closed without [DONE]
+        for chunk in CHUNKS[1:]:
+            self.event("data: " + json.dumps({"choices": [{"delta": {"content": chunk}}]}))
+        self.event("data: [DONE]")
+
+    def event(self, line):
+        self.wfile.write(f"{line}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def stub_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/chat/completions"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def generator(stub_url):
+    StubHandler.calls.clear()
+    return ProfileGenerator("test-key", base_url=stub_url, timeout=5)
+
+
+def prompt(candidate, bench_id=1, tgv_best="Cognitive", tgv_gap="Context"):
+    return {
+        "job_vacancy_id": bench_id,
+        "tgv_best": tgv_best,
+        "tgv_gap": tgv_gap,
+        "candidate_id": candidate,
+        "candidate_top_tvs": [{"tv_name": "IQ", "tv_match_rate": 98.5}],
+        "candidate_low_tvs": [{"tv_name": "Pauli", "tv_match_rate": 41.0}],
+    }
+
+
+def test_stream_yields_chunks_then_caches(generator):
+    assert list(generator.stream(prompt("E1"))) == CHUNKS
+    assert generator.cached(prompt("E1")) == "".join(CHUNKS)
+    # a cache hit is one piece and no request
+    assert list(generator.stream(prompt("E1"))) == ["".join(CHUNKS)]
+    assert StubHandler.calls["E1"] == 1
+
+
+def test_cache_key_is_the_whole_prompt(generator):
+    list(generator.stream(prompt("E2")))
+    assert list(generator.stream(prompt("E2"))) == ["".join(CHUNKS)]
+    assert StubHandler.calls["E2"] == 1
+    # the prompt names the best / gap TGV: another pair is another profile
+    list(generator.stream(prompt("E2", tgv_best="Competencies", tgv_gap="Cognitive")))
+    assert StubHandler.calls["E2"] == 2
+    # and so is another benchmark
+    list(generator.stream(prompt("E2", bench_id=2)))
+    assert StubHandler.calls["E2"] == 3
+
+
+def test_prefetch_dedups_and_stream_waits_for_it(generator):
+    batch = [prompt("slow-1"), prompt("slow-2"), prompt("slow-1")]
+    futures = generator.prefetch(batch)
+    assert len(futures) == 2
+    assert generator.prefetch(batch) == []  # still in flight
+    # a stream of an in-flight profile waits for it instead of calling again
+    assert list(generator.stream(prompt("slow-1"))) == ["".join(CHUNKS)]
+    for future in futures:
+        future.result()
+    assert generator.prefetch(batch) == []  # now cached
+    assert StubHandler.calls == Counter({"slow-1": 1, "slow-2": 1})
+    assert generator.pending() == 0
+
+
+def test_stream_decodes_utf8(generator):
+    assert list(generator.stream(prompt("utf8-1"))) == UTF8_CHUNKS
+    assert generator.cached(prompt("utf8-1")) == "".join(UTF8_CHUNKS)
+
+
+@pytest.mark.parametrize("candidate", ["error-1", "cut-1"])
+def test_mid_stream_failure_caches_nothing(generator, candidate):
+    received = []
+    with pytest.raises(ProfileGenerationError):
+        for chunk in generator.stream(prompt(candidate)):
+            received.append(chunk)
+    assert received == CHUNKS[:1]
+    assert generator.cached(prompt(candidate)) is None
+    # the next attempt goes back to the server
+    with pytest.raises(ProfileGenerationError):
+        list(generator.stream(prompt(candidate)))
+    assert StubHandler.calls[candidate] == 2
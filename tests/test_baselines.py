@@ -0,0 +1,53 @@
+"""Data-version checks of the stored baselines and distributions."""
+import numpy as np
+import pytest
+
+from talent_match.baselines import compute_distribution, distribution_stale, version_stale
+
+
+class VersionsConnection:
+    """Answers DISTRIBUTION_VERSION_SQL: count, min, max and any NULL of source_version."""
+
+    def __init__(self, *versions):
+        self.versions = [v for v in versions if v is not None]
+        self.count = len(versions)
+
+    def execute(self, statement, params=None):
+        assert "FROM tv_distributions" in str(statement)
+        return self
+
+    def first(self):
+        return (self.count, min(self.versions, default=None), max(self.versions, default=None),
+                len(self.versions) < self.count)
+
+
+@pytest.mark.parametrize("stored, current, stale", [
+    (7, 7, False),
+    (np.int64(7), 7, False),      # read back from pandas
+    (6, 7, True),                 # older data
+    (8, 7, True),                 # newer stamp, e.g. after the source tables were reloaded
+    (None, 7, True),              # unknown version
+    (7, None, True),              # no result store: no version to compare against
+    (None, None, True),
+])
+def test_version_stale(stored, current, stale):
+    assert version_stale(stored, current) is stale
+
+
+@pytest.mark.parametrize("versions, current, stale", [
+    ((7, 7, 7), 7, False),
+    ((), 7, True),                # empty table
+    ((6, 7, 7), 7, True),         # partly rewritten
+    ((7, 8), 7, True),
+    ((7, None), 7, True),         # a NULL stamp, which load_distribution rejects
+    ((7, 7), None, True),
+])
+def test_distribution_stale(versions, current, stale):
+    assert distribution_stale(VersionsConnection(*versions), current) is stale
+
+
+def test_compute_distribution_carries_the_version(synth_matrix):
+    dist = compute_distribution(synth_matrix, source_version=42)
+    assert dist.source_version == 42
+    assert not version_stale(dist.source_version, 42)
+    assert (dist.n <= synth_matrix.in_employees.sum()).all()
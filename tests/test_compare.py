@@ -0,0 +1,69 @@
+"""compare.score_many against one score_benchmark per benchmark, on synth data."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from talent_match.compare import compare_benchmarks, score_many
+from talent_match.matching import score_benchmark
+
+
+@pytest.fixture(scope="module")
+def matrix(synth_matrix):
+    return synth_matrix
+
+
+def benchmark_list(matrix):
+    ids = matrix.employee_ids
+    reweighted = {"tgv": {"Competencies": 0.1, "Cognitive": 0.6}, "tv": {"iq": 3, "gtq": 0}}
+    return [
+        ([ids[0], ids[1], ids[2]], {}),
+        ([ids[10], ids[11]], {}),
+        ([ids[0], ids[1], ids[2]], {}),                   # duplicate of the first
+        ([], {}),                                         # empty: nobody is scored
+        (["NOPE"], {}),                                   # unknown ids only
+        ([ids[0], ids[1], ids[2]], reweighted),           # same baselines, other weights
+        ([ids[20], ids[20], ids[21], ids[-1]], {}),       # repeated id, one outside `employees`
+        ([ids[30], ids[31], ids[32]], {"tgv": {"Context": 1}}),
+    ]
+
+
+def expected_final(matrix, ids, weights):
+    """score_benchmark's final rate, NaN outside the benchmark's ranking (as rank_benchmark)."""
+    result = score_benchmark(matrix, ids, weights)
+    ranked = matrix.in_employees & (matrix.present & result.has_baseline).any(axis=1)
+    return np.where(ranked, result.final_match_rate, np.nan)
+
+
+@pytest.mark.parametrize("block_elements", [1_000, 2_000_000])  # many row blocks / one block
+def test_score_many_matches_score_benchmark(matrix, block_elements):
+    benchmarks = benchmark_list(matrix)
+    got = score_many(matrix, benchmarks, block_elements=block_elements)
+    assert got.shape == (len(matrix.employee_ids), len(benchmarks))
+    for b, (ids, weights) in enumerate(benchmarks):
+        np.testing.assert_allclose(got[:, b], expected_final(matrix, ids, weights), atol=1e-9, err_msg=f"benchmark {b}")
+
+
+def test_duplicate_and_empty_benchmarks(matrix):
+    got = score_many(matrix, benchmark_list(matrix))
+    np.testing.assert_array_equal(got[:, 0], got[:, 2])
+    assert np.isnan(got[:, 3]).all() and np.isnan(got[:, 4]).all()
+    # re-weighting changes the scores but not who is ranked
+    assert not np.allclose(got[:, 0], got[:, 5], equal_nan=True)
+    np.testing.assert_array_equal(np.isnan(got[:, 0]), np.isnan(got[:, 5]))
+
+
+def test_compare_benchmarks_best_fit(matrix):
+    benchmarks = benchmark_list(matrix)
+    frame = pd.DataFrame({
+        "job_vacancy_id": range(1, len(benchmarks) + 1),
+        "role_name": [f"role {i}" for i in range(len(benchmarks))],
+        "selected_talent_ids": [ids for ids, _ in benchmarks],
+        "weights_config": [w for _, w in benchmarks],
+    })
+    comparison = compare_benchmarks(matrix, frame)
+    expected = np.column_stack([expected_final(matrix, ids, w) for ids, w in benchmarks])
+    np.testing.assert_allclose(comparison.final, expected, atol=0.005)  # stored as float32
+    table = comparison.frame()
+    assert set(table["employee_id"]) == set(matrix.employee_ids[~np.isnan(expected).all(axis=1)])
+    best = np.nanmax(expected[matrix.rows_for(table["employee_id"])], axis=1)
+    np.testing.assert_allclose(table["best_rate"], best, atol=0.005)
@@ -0,0 +1,96 @@
+"""Job queue updates are guarded by the claiming worker (needs Postgres).
+
+Set TEST_DATABASE_URL to a database these tests may create a scratch schema in;
+otherwise they are skipped.
+"""
+import os
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from talent_match import jobs
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+pytestmark = pytest.mark.skipif(not TEST_DATABASE_URL, reason="set TEST_DATABASE_URL to run the job queue tests")
+
+TALENT_BENCHMARKS_DDL = """
+CREATE TABLE talent_benchmarks (
+  job_vacancy_id      SERIAL PRIMARY KEY,
+  role_name           TEXT,
+  job_level           TEXT,
+  role_purpose        TEXT,
+  selected_talent_ids TEXT[],
+  weights_config      JSONB,
+  created_at          TIMESTAMPTZ DEFAULT now()
+)
+"""
+
+
+@pytest.fixture
+def engine():
+    schema = f"test_jobs_{uuid.uuid4().hex[:8]}"
+    admin = create_engine(TEST_DATABASE_URL)
+    with admin.begin() as con:
+        con.execute(text(f"CREATE SCHEMA {schema}"))
+    engine = create_engine(TEST_DATABASE_URL, connect_args={"options": f"-csearch_path={schema}"})
+    try:
+        with engine.begin() as con:
+            con.execute(text(TALENT_BENCHMARKS_DDL))
+        jobs.apply_doc(engine)
+        yield engine
+    finally:
+        engine.dispose()
+        with admin.begin() as con:
+            con.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+def payload():
+    return jobs.benchmark_payload("Analyst", "V", "test", ["E1", "E2"], {"tgv": {"Cognitive": 0.5}})
+
+
+def lose_job(engine, job, worker="worker-b"):
+    """``job``'s worker stops heartbeating: re-queued, then claimed by ``worker``."""
+    assert jobs.requeue_stale(engine, stale_after_s=0) == 1
+    taken = jobs.claim(engine, max_running=1, worker=worker)
+    assert taken.job_id == job.job_id and taken.attempts == 2
+    return taken
+
+
+def test_only_the_claiming_worker_updates_the_job(engine):
+    job, created = jobs.enqueue(engine, "save_and_score", payload())
+    assert created
+    job = jobs.claim(engine, max_running=1, worker="worker-a")
+    lose_job(engine, job)
+
+    jobs.set_progress(engine, job.job_id, 0.9, "late progress", worker="worker-a")
+    assert not jobs.finish(engine, job.job_id, {"by": "a"}, worker="worker-a")
+    assert not jobs.fail(engine, job.job_id, "late failure", worker="worker-a")
+    (row,) = jobs.get_jobs(engine, [job.job_id])
+    assert (row.status, row.message, row.progress) == ("running", "started", 0)
+
+    assert jobs.finish(engine, job.job_id, {"by": "b"}, worker="worker-b")
+    (row,) = jobs.get_jobs(engine, [job.job_id])
+    assert (row.status, row.result) == ("done", {"by": "b"})
+    assert not jobs.fail(engine, job.job_id, "after done", worker="worker-b")
+
+
+def test_lost_job_does_not_insert_its_benchmark(engine):
+    job, _ = jobs.enqueue(engine, "save_and_score", payload())
+    job = jobs.claim(engine, max_running=1, worker="worker-a")
+    lose_job(engine, job)
+
+    handle = jobs.save_and_score(lambda bench_id, progress: {"scored": bench_id})
+    with pytest.raises(jobs.JobLost):
+        handle(jobs.JobContext(engine, job, "worker-a"), payload())
+    with engine.connect() as con:
+        assert con.execute(text("SELECT COUNT(*) FROM talent_benchmarks")).scalar() == 0
+
+    # the worker that holds the job saves the benchmark once and keeps it on the row
+    taken = jobs.get_jobs(engine, [job.job_id])[0]
+    out = handle(jobs.JobContext(engine, taken, "worker-b"), payload())
+    (row,) = jobs.get_jobs(engine, [job.job_id])
+    assert out["job_vacancy_id"] == out["scored"] == row.job_vacancy_id
+    with engine.connect() as con:
+        assert con.execute(text("SELECT COUNT(*) FROM talent_benchmarks")).scalar() == 1
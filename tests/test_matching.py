@@ -0,0 +1,237 @@
+"""score_benchmark against a pandas re-implementation of v_benchmark_matching."""
+import math
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from talent_match.matching import (
+    build_tv_matrix, page_cursor, result_frame, round_half_up, score_benchmark, top_candidates,
+)
+from talent_match.weights import parse_weights
+
+NAN = np.nan
+
+# tv_all rows: (employee_id, tgv_name, tv_name, user_score, direction)
+TV_ALL = pd.DataFrame(
+    [
+        # Competencies: plain TVs, a NULL user score (-> 100) and a half-up average
+        ("E1", "Competencies", "Drive", 100.0, "higher"),
+        ("E2", "Competencies", "Drive", 80.0, "higher"),
+        ("E3", "Competencies", "Drive", 60.0, "higher"),
+        ("E4", "Competencies", "Drive", NAN, "higher"),
+        ("E5", "Competencies", "Drive", 120.0, "higher"),
+        ("E1", "Competencies", "Focus", 100.0, "higher"),
+        ("E2", "Competencies", "Focus", 100.0, "higher"),
+        ("E3", "Competencies", "Focus", 100.0, "higher"),
+        ("E4", "Competencies", "Focus", 80.01, "higher"),
+        ("E5", "Competencies", "Focus", 50.0, "higher"),
+        # Cognitive: even number of non-NULL bench scores (PERCENTILE_DISC takes the lower middle)
+        ("E1", "Cognitive", "IQ", 90.0, "higher"),
+        ("E2", "Cognitive", "IQ", 110.0, "higher"),
+        ("E3", "Cognitive", "IQ", NAN, "higher"),
+        ("E4", "Cognitive", "IQ", 100.0, "higher"),
+        ("E5", "Cognitive", "IQ", 130.0, "higher"),
+        # PersonalityPAPI: every bench score NULL -> NULL baseline -> NULL rate
+        ("E1", "PersonalityPAPI", "Papi_A", NAN, "higher"),
+        ("E2", "PersonalityPAPI", "Papi_A", NAN, "higher"),
+        ("E4", "PersonalityPAPI", "Papi_A", 5.0, "higher"),
+        # Context: baseline 0 -> NULL rate
+        ("E1", "Context", "PerformanceRating", 0.0, "higher"),
+        ("E2", "Context", "PerformanceRating", 0.0, "higher"),
+        ("E3", "Context", "PerformanceRating", 0.0, "higher"),
+        ("E4", "Context", "PerformanceRating", 3.0, "higher"),
+        # BehaviorStrengths: lower is better, clipped to [0, 100]
+        ("E1", "BehaviorStrengths", "StrengthsRankAvg", 10.0, "lower"),
+        ("E2", "BehaviorStrengths", "StrengthsRankAvg", 12.0, "lower"),
+        ("E3", "BehaviorStrengths", "StrengthsRankAvg", 8.0, "lower"),
+        ("E4", "BehaviorStrengths", "StrengthsRankAvg", 25.0, "lower"),
+        ("E5", "BehaviorStrengths", "StrengthsRankAvg", 5.0, "lower"),
+        # not in `employees`: scored into the baseline, never in the result
+        ("E9", "Competencies", "Drive", 70.0, "higher"),
+    ],
+    columns=["employee_id", "tgv_name", "tv_name", "user_score", "direction"],
+)
+EMPLOYEES = pd.DataFrame({
+    "employee_id": ["E1", "E2", "E3", "E4", "E5"],
+    "fullname": ["A", "B", "C", "D", "E"],
+    "directorate": "Ops", "role": "Analyst", "grade": "V",
+})
+
+
+def pg_round(value, decimals=2):
+    """ROUND(numeric, 2); None for NULL."""
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return NAN
+    return float(Decimal(f"{value:.9f}").quantize(Decimal(10) ** -decimals, rounding=ROUND_HALF_UP))
+
+
+def percentile_disc_half(scores):
+    """PERCENTILE_DISC(0.5): the ceil(n/2)-th non-NULL value in order."""
+    ordered = sorted(s for s in scores if not math.isnan(s))
+    return ordered[math.ceil(len(ordered) * 0.5) - 1] if ordered else NAN
+
+
+def view_reference(tv_all, employees, bench_ids, weights_config=None):
+    """The view's CTEs for one benchmark, row by row."""
+    tgv_weights, tv_weights = parse_weights(weights_config)
+    bench_tv = tv_all.merge(pd.DataFrame({"employee_id": bench_ids}), on="employee_id")  # like UNNEST
+    baseline = {
+        key: percentile_disc_half(group["user_score"].tolist())
+        for key, group in bench_tv.groupby(["tgv_name", "tv_name"])
+    }
+    rows = []
+    for r in tv_all.itertuples():
+        if (r.tgv_name, r.tv_name) not in baseline:
+            continue  # no baseline row for this benchmark
+        base, user = baseline[(r.tgv_name, r.tv_name)], r.user_score
+        if math.isnan(base) or base == 0:
+            rate = NAN
+        elif math.isnan(user):
+            rate = 100.0  # LEAST / GREATEST ignore NULL
+        elif r.direction == "higher":
+            rate = min(100.0, 100.0 * user / base)
+        else:
+            rate = max(0.0, min(100.0, 100.0 * (2 * base - user) / base))
+        rows.append((r.employee_id, r.tgv_name, r.tv_name, base, user, rate))
+    tm = pd.DataFrame(rows, columns=["employee_id", "tgv_name", "tv_name", "baseline_score", "user_score", "tv_match_rate"])
+    tm["w"] = tm["tv_name"].map(lambda name: tv_weights.get(name, 1.0))
+
+    def tgv_rate(group):
+        valid = group["tv_match_rate"].notna()
+        wsum = group.loc[valid, "w"].sum()
+        return (group.loc[valid, "tv_match_rate"] * group.loc[valid, "w"]).sum() / wsum if wsum else NAN
+
+    tgv = {key: tgv_rate(g) for key, g in tm.groupby(["employee_id", "tgv_name"])}
+    final = {}
+    for (emp, name), rate in tgv.items():
+        final[emp] = final.get(emp, 0.0) + tgv_weights[name] * (0.0 if math.isnan(rate) else rate)
+    tm["tgv_match_rate"] = [tgv[(e, g)] for e, g in zip(tm["employee_id"], tm["tgv_name"])]
+    tm["final_match_rate"] = tm["employee_id"].map(final)
+    tm = tm[tm["employee_id"].isin(employees["employee_id"])]  # JOIN employees
+    for col in ["baseline_score", "user_score", "tv_match_rate", "tgv_match_rate", "final_match_rate"]:
+        tm[col] = tm[col].map(pg_round)
+    return tm.drop(columns="w")
+
+
+def engine_frame(bench_ids, weights_config=None):
+    matrix = build_tv_matrix(TV_ALL, EMPLOYEES)
+    return result_frame(matrix, score_benchmark(matrix, bench_ids, weights_config))
+
+
+def assert_parity(bench_ids, weights_config=None):
+    keys = ["employee_id", "tgv_name", "tv_name"]
+    got = engine_frame(bench_ids, weights_config).sort_values(keys).reset_index(drop=True)
+    want = view_reference(TV_ALL, EMPLOYEES, bench_ids, weights_config).sort_values(keys).reset_index(drop=True)
+    cols = keys + ["baseline_score", "user_score", "tv_match_rate", "tgv_match_rate", "final_match_rate"]
+    pd.testing.assert_frame_equal(got[cols], want[cols], check_dtype=False, atol=1e-9, rtol=0)
+    return got
+
+
+@pytest.mark.parametrize("bench_ids", [
+    ["E1", "E2", "E3"],          # odd count
+    ["E1", "E2", "E3", "E4"],    # even count, NULLs mixed in
+    ["E1", "E1", "E2"],          # repeated id weighs twice
+    ["E1", "E9"],                # bench employee missing from `employees`
+    ["E1", "NOPE"],              # unknown id is ignored
+])
+def test_parity_with_view(bench_ids):
+    assert_parity(bench_ids)
+
+
+def test_parity_with_custom_weights():
+    assert_parity(["E1", "E2", "E3"], {"tgv": {"Competencies": 2, "Context": 0}, "tv": {"Drive": 3}})
+
+
+def test_null_user_score_scores_100():
+    got = assert_parity(["E1", "E2", "E3"]).set_index(["employee_id", "tv_name"])
+    assert got.loc[("E4", "Drive"), "tv_match_rate"] == 100.0
+
+
+def test_null_and_zero_baseline_give_null_rate():
+    got = assert_parity(["E1", "E2", "E3"]).set_index(["employee_id", "tv_name"])
+    assert np.isnan(got.loc[("E4", "Papi_A"), "baseline_score"])
+    assert np.isnan(got.loc[("E4", "Papi_A"), "tv_match_rate"])
+    assert got.loc[("E4", "PerformanceRating"), "baseline_score"] == 0.0
+    assert np.isnan(got.loc[("E4", "PerformanceRating"), "tv_match_rate"])
+
+
+def test_percentile_disc_picks_ceil_half():
+    got = assert_parity(["E1", "E2", "E3", "E4"]).set_index(["employee_id", "tv_name"])
+    # IQ of the bench: 90, 110, NULL, 100 -> n=3 non-NULL -> 2nd = 100
+    assert got.loc[("E1", "IQ"), "baseline_score"] == 100.0
+    # Drive: 100, 80, 60, NULL -> 2nd of (60, 80, 100) = 80
+    assert got.loc[("E1", "Drive"), "baseline_score"] == 80.0
+    # StrengthsRankAvg: 10, 12, 8, 25 -> 2nd of 4 = 10 (no interpolation)
+    assert got.loc[("E1", "StrengthsRankAvg"), "baseline_score"] == 10.0
+
+
+def test_final_rounds_half_up():
+    # only Competencies counts: E4 = (100 + 80.01) / 2 = 90.005 -> 90.01 (NumPy's round gives 90.0)
+    got = assert_parity(["E1", "E2", "E3"], {"tgv": {"Competencies": 1, "Cognitive": 0, "PersonalityPAPI": 0,
+                                                      "Context": 0, "BehaviorStrengths": 0}})
+    assert got.loc[got["employee_id"] == "E4", "final_match_rate"].iloc[0] == 90.01
+
+
+def test_round_half_up():
+    np.testing.assert_array_equal(round_half_up([0.125, 2.675, -1.005, 1.004]), [0.13, 2.68, -1.01, 1.0])
+
+
+def test_top_candidates_matches_result_frame():
+    matrix = build_tv_matrix(TV_ALL, EMPLOYEES)
+    result = score_benchmark(matrix, ["E1", "E2", "E3"])
+    top = top_candidates(matrix, result, k=10)
+    long = result_frame(matrix, result)
+    expected = long.drop_duplicates("employee_id")[["employee_id", "final_match_rate"]].reset_index(drop=True)
+    pd.testing.assert_frame_equal(top[["employee_id", "final_match_rate"]], expected)
+
+
+# one TV, benchmark T1: T2..T5 tie at 80 (final 32.0), listed out of id order
+TIES = pd.DataFrame(
+    [("T5", 80.0), ("T1", 100.0), ("T3", 80.0), ("T6", 50.0), ("T2", 80.0), ("T4", 80.0)],
+    columns=["employee_id", "user_score"],
+).assign(tgv_name="Competencies", tv_name="Drive", direction="higher")
+TIE_EMPLOYEES = pd.DataFrame({
+    "employee_id": ["T1", "T2", "T3", "T4", "T5", "T6"],
+    "fullname": list("ABCDEF"), "directorate": "Ops", "role": "Analyst", "grade": "V",
+})
+
+
+def tie_ranking():
+    matrix = build_tv_matrix(TIES, TIE_EMPLOYEES)
+    return matrix, score_benchmark(matrix, ["T1"])
+
+
+def test_top_candidates_breaks_ties_by_employee_id():
+    matrix, result = tie_ranking()
+    top = top_candidates(matrix, result, k=10)
+    assert top["employee_id"].tolist() == ["T1", "T2", "T3", "T4", "T5", "T6"]
+    assert top["final_match_rate"].tolist() == [40.0, 32.0, 32.0, 32.0, 32.0, 20.0]
+    # a cursor inside the tie resumes right after that employee
+    after = top_candidates(matrix, result, k=10, after=(32.0, "T3"))
+    assert after["employee_id"].tolist() == ["T4", "T5", "T6"]
+
+
+@pytest.mark.parametrize("k", [1, 2, 4, 6, 7])
+def test_page_cursor_walks_the_whole_ranking_once(k):
+    matrix, result = tie_ranking()
+    pages, cursor = [], None
+    while True:
+        page = top_candidates(matrix, result, k=k, after=cursor)
+        pages.append(page)
+        cursor = page_cursor(page, k)
+        if cursor is None:
+            break
+        assert cursor == (page["final_match_rate"].iloc[-1], page["employee_id"].iloc[-1])
+    walked = pd.concat(pages, ignore_index=True)
+    pd.testing.assert_frame_equal(walked, top_candidates(matrix, result, k=10))
+    # a full last page still yields a cursor; the page after it is empty and ends the walk
+    assert len(pages) == len(TIES) // k + 1
+    assert len(pages[-1]) == len(TIES) % k
+
+
+def test_page_cursor_is_none_for_a_short_or_empty_page():
+    matrix, result = tie_ranking()
+    assert page_cursor(top_candidates(matrix, result, k=10), 10) is None
+    assert page_cursor(top_candidates(matrix, result, k=10, after=(0.0, "T9")), 10) is None
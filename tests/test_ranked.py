@@ -0,0 +1,61 @@
+"""rank_benchmark against the matching.py frames, and the matrix-token cache key."""
+import pandas as pd
+
+from talent_match.cache import QueryCache
+from talent_match.matching import build_tv_matrix, candidate_detail, result_frame, score_benchmark, top_candidates
+from talent_match.ranked import rank_benchmark, ranking_key
+
+WEIGHTS = {"tgv": {"Cognitive": 0.6, "Context": 0.05}, "tv": {"iq": 3, "gtq": 0}}
+
+
+def test_ranking_matches_matching_frames(synth_matrix):
+    ids = list(synth_matrix.employee_ids[:3])
+    ranking = rank_benchmark(synth_matrix, ids, WEIGHTS, bench_id=1)
+    result = score_benchmark(synth_matrix, ids, WEIGHTS)
+    top = top_candidates(synth_matrix, result, k=len(synth_matrix.employee_ids))
+    assert len(ranking) == len(top)
+    pd.testing.assert_frame_equal(ranking.head(len(ranking)), top, check_dtype=False, atol=1e-9, rtol=0)
+    pd.testing.assert_frame_equal(ranking.long_frame(), result_frame(synth_matrix, result), check_dtype=False)
+    employee_id = top["employee_id"].iloc[7]
+    pd.testing.assert_frame_equal(ranking.detail(employee_id), candidate_detail(synth_matrix, result, employee_id),
+                                  check_dtype=False)
+    assert ranking.detail("NOPE").empty
+
+
+def test_ranking_key_follows_the_matrix_token(synth_data):
+    tv_long, employees = synth_data
+    matrix = build_tv_matrix(tv_long, employees)
+    reloaded = build_tv_matrix(tv_long, employees)  # same data, new load
+    ids = list(matrix.employee_ids[:3])
+    key = ranking_key(matrix, 1, ids, WEIGHTS)
+    assert key == ranking_key(matrix, 1, ids, {"tv": {"gtq": 0, "iq": 3}, "tgv": {"Context": 0.05, "Cognitive": 0.6}})
+    assert ranking_key(matrix, 1, ids) == ranking_key(matrix, 1, ids, {})
+    assert key != ranking_key(reloaded, 1, ids, WEIGHTS)
+    assert key != ranking_key(matrix, 2, ids, WEIGHTS)
+    assert key != ranking_key(matrix, 1, ids[:2], WEIGHTS)
+    assert key != ranking_key(matrix, 1, ids)
+
+
+def test_new_matrix_never_reuses_a_cached_ranking(synth_data):
+    tv_long, employees = synth_data
+    cache = QueryCache()
+
+    def ranked(matrix, ids):
+        return cache.get_or_load(ranking_key(matrix, 1, ids), lambda: rank_benchmark(matrix, ids, bench_id=1))
+
+    old = build_tv_matrix(tv_long, employees)
+    ids = list(old.employee_ids[:3])
+    first = ranked(old, ids)
+    assert ranked(old, ids) is first
+
+    # the best candidate's rows are deleted: the next load must not serve the old ranking
+    best = next(e for e in first.head(10)["employee_id"] if e not in ids)
+    new = build_tv_matrix(tv_long[tv_long["employee_id"] != best], employees)
+    fresh = ranked(new, ids)
+    assert fresh is not first and fresh.matrix is new
+    assert best in set(first.head(len(first))["employee_id"])
+    assert best not in set(fresh.head(len(fresh))["employee_id"])
+
+    # dropping every entry (as get_tv_matrix does on a reload) frees the old ranking too
+    assert cache.invalidate() == 2
+    assert ranked(old, ids) is not first